@@ -6,6 +6,8 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parents[2]
 UPLOAD_DIR = BASE_DIR / "uploads"
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+UPLOAD_FSYNC = os.getenv("UPLOAD_FSYNC", "1").lower() not in {"0", "false", "no"}
 
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{BASE_DIR / 'backend.db'}")
 
@@ -23,3 +25,32 @@ ALLOWED_ORIGINS = [
     for origin in os.getenv("CORS_ORIGINS", ",".join(DEFAULT_ORIGINS)).split(",")
     if origin.strip()
 ]
+
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "1"))
+OCR_ENGINE = os.getenv("OCR_ENGINE", "auto")
+ROOM_DETECT_MAX_SIDE_PX = int(os.getenv("ROOM_DETECT_MAX_SIDE_PX", "4096"))
+ROOM_DETECT_WORKERS = int(os.getenv("ROOM_DETECT_WORKERS", str(os.cpu_count() or 1)))
+PLAN_JOB_WORKERS = int(os.getenv("PLAN_JOB_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+
+PRICE_LOOKUP_DEADLINE_S = float(os.getenv("PRICE_LOOKUP_DEADLINE_S", "30"))
+# Snippet prices scoring at least this (0 to 1) are used without fetching pages.
+SNIPPET_CONFIDENCE_THRESHOLD = float(os.getenv("SNIPPET_CONFIDENCE_THRESHOLD", "0.6"))
+
+CACHE_DIR = Path(os.getenv("CACHE_DIR", str(BASE_DIR / "cache")))
+SEARCH_CACHE_TTL_S = float(os.getenv("SEARCH_CACHE_TTL_S", str(24 * 3600)))
+PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Store pages are read only up to this size when looking for a price.
+PAGE_MAX_BYTES = int(os.getenv("PAGE_MAX_BYTES", str(4 * 1024 * 1024)))
+
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+# Per-host overrides, e.g. "www.castorama.fr=20,www.pointp.fr=8".
+HTTP_HOST_POOL_SIZES = os.getenv("HTTP_HOST_POOL_SIZES", "")
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_KEEPALIVE_EXPIRY_S = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_S", "30"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "0").lower() in {"1", "true", "yes"}
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+
+GOOGLE_SEARCH_RATE_PER_S = float(os.getenv("GOOGLE_SEARCH_RATE_PER_S", "5"))
+GOOGLE_SEARCH_BURST = int(os.getenv("GOOGLE_SEARCH_BURST", "5"))
+GOOGLE_DAILY_QUOTA = int(os.getenv("GOOGLE_DAILY_QUOTA", "100"))
+GOOGLE_QUOTA_RESERVE = int(os.getenv("GOOGLE_QUOTA_RESERVE", "5"))
@@ -3,6 +3,7 @@ from __future__ import annotations
 from contextlib import contextmanager
 from typing import Generator
 
+from sqlalchemy import inspect, text
 from sqlmodel import Session, SQLModel, create_engine
 
 from .config import DATABASE_URL
@@ -12,6 +13,32 @@ engine = create_engine(DATABASE_URL, echo=False, connect_args={"check_same_threa
 
 def init_db() -> None:
     SQLModel.metadata.create_all(engine)
+    _add_missing_columns()
+
+
+def _add_missing_columns() -> None:
+    """Bring tables created by an older version up to date.
+
+    ``create_all`` only creates missing tables, so nullable columns added to
+    an existing model (and their indexes) are added here.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(
+                    text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}')
+                )
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+
 @contextmanager
 def get_session() -> Generator[Session, None, None]:
     session = Session(engine)
@@ -1,16 +1,46 @@
 from __future__ import annotations
 
-from fastapi import FastAPI
+from typing import Any
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from plan_ai import plan_reader  # noqa: F401
+from plan_ai.ocr import get_ocr_capabilities
+from shared.utils import log_info
 
-from .config import ALLOWED_ORIGINS
+from .config import ALLOWED_ORIGINS, MAX_UPLOAD_BYTES
 from .database import init_db
 from .routers import plans, prices
+from .services.job_service import fail_interrupted_jobs, shutdown_job_executor
+from .services.price_service import (
+    close_shared_async_service,
+    get_http_transport,
+    get_search_cache,
+    get_search_throttle,
+)
+from .storage import UploadTooLargeError
 
 app = FastAPI(title="Plan & Prix API")
 
+# Room for the multipart envelope and form fields around the file itself.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """Refuse a declared oversized body before it is read and spooled.
+
+    Registered before CORS so the 413 still carries the CORS headers.
+    """
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES:
+        detail = str(UploadTooLargeError(MAX_UPLOAD_BYTES))
+        return JSONResponse(status_code=413, content={"detail": detail})
+    return await call_next(request)
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
@@ -23,12 +53,31 @@ app.add_middleware(
 @app.on_event("startup")
 def on_startup() -> None:
     init_db()
+    fail_interrupted_jobs()
+    ocr = get_ocr_capabilities()
+    if ocr.available:
+        log_info(f"Tesseract {ocr.version} ({', '.join(ocr.languages) or 'langues inconnues'})")
+    else:
+        log_info(f"OCR indisponible: {ocr.error}")
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    shutdown_job_executor()
+    await close_shared_async_service()
 
 
 @app.get("/health")
-def health() -> dict[str, str]:
-    return {"status": "ok"}
+def health() -> dict[str, Any]:
+    return {
+        "status": "ok",
+        "ocr": get_ocr_capabilities().as_dict(),
+        "google_search": get_search_throttle().describe(),
+        "search_cache": get_search_cache().describe(),
+        "http_pools": get_http_transport().stats(),
+    }
 
 
 app.include_router(plans.router)
 app.include_router(prices.router)
+app.include_router(prices.history_router)
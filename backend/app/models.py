@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import os
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
@@ -16,6 +18,8 @@ class PlanRecord(SQLModel, table=True):
     total_length_m: float
     dominant_label: Optional[str] = None
     measurements_json: str
+    content_hash: Optional[str] = Field(default=None, index=True)
+    analysis_key: Optional[str] = Field(default=None, index=True)
 
 
 class PriceRequestRecord(SQLModel, table=True):
@@ -24,3 +28,43 @@ class PriceRequestRecord(SQLModel, table=True):
     query: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
     results_json: str
+
+
+class PriceObservation(SQLModel, table=True):
+    """One store price found by a lookup, kept for latest/history queries."""
+
+    __table_args__ = (
+        Index(
+            "ix_priceobservation_product_store_observed",
+            "product_key",
+            "store",
+            "observed_at",
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    product_key: str
+    store: str
+    url: str
+    value_eur: float
+    source: str
+    observed_at: datetime = Field(default_factory=datetime.utcnow)
+    request_id: Optional[int] = Field(default=None, foreign_key="pricerequestrecord.id")
+
+
+class PlanJob(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    filename: str
+    stored_path: str
+    coverage: float = 1.0
+    content_hash: Optional[str] = None
+    analysis_key: Optional[str] = None
+    status: str = Field(default="pending", index=True)
+    stage: Optional[str] = None
+    progress: float = 0.0
+    error: Optional[str] = None
+    plan_id: Optional[int] = Field(default=None, foreign_key="planrecord.id")
+    # Server process whose pool runs the job (see fail_interrupted_jobs).
+    owner_pid: Optional[int] = Field(default_factory=os.getpid)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
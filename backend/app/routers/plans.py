@@ -1,24 +1,32 @@
 from __future__ import annotations
 
+import itertools
 import json
-import shutil
+from dataclasses import asdict
 from pathlib import Path
-from typing import List
+from typing import Any, Iterator, List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.params import Form
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session, select
 
-from ..config import UPLOAD_DIR
-from ..database import get_db_session
-from ..models import PlanRecord, PriceRequestRecord
+from plan_ai.models import PlanAnalysis, PlanMeasurement
+from shared.utils import log_info
+
+from ..database import get_db_session, get_session
+from ..models import PlanJob, PlanRecord, PriceRequestRecord
 from ..schemas import (
     MeasurementSchema,
     PlanCreateResponse,
     PlanDetailSchema,
+    PlanJobSchema,
     PlanSummarySchema,
 )
+from ..services.job_service import submit_plan_job, upload_in_use
 from ..services.plan_service import PlanService
+from ..storage import StoredUpload, UploadTooLargeError, release_upload, store_upload
 
 router = APIRouter(prefix="/plans", tags=["plans"])
 
@@ -44,37 +52,260 @@ def upload_plan(
     session: Session = Depends(get_db_session),
     plan_service: PlanService = Depends(get_plan_service),
 ) -> PlanCreateResponse:
-    suffix = Path(file.filename).suffix.lower()
-    if suffix not in {".pdf", ".png", ".jpg", ".jpeg"}:
-        raise HTTPException(status_code=400, detail="Format supporté: PDF, PNG, JPG.")
+    _check_suffix(file)
+    upload = _store_upload(file)
+    try:
+        return _analyze_upload(session, plan_service, file.filename, upload, coverage)
+    finally:
+        _release_upload(session, upload.path)
 
-    temp_path = UPLOAD_DIR / f"{file.filename}"
-    with temp_path.open("wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+
+def _analyze_upload(
+    session: Session,
+    plan_service: PlanService,
+    filename: str,
+    upload: StoredUpload,
+    coverage: float,
+) -> PlanCreateResponse:
+    analysis_key = plan_service.analysis_key(upload.content_hash)
+    cached = _find_cached_plan(session, analysis_key)
+    if cached is not None:
+        measurements = plan_service.measurements_from_json(cached.measurements_json)
+        return _plan_create_response(
+            cached, measurements, plan_service.estimate(measurements, coverage)
+        )
 
     try:
-        analysis, data = plan_service.analyze_plan(temp_path, coverage)
+        analysis, data = plan_service.analyze_plan(upload.path, coverage)
     except RuntimeError as exc:
-        if temp_path.exists():
-            temp_path.unlink()
         raise HTTPException(status_code=422, detail=str(exc)) from exc
-    summary = data["summary"]
-    estimation = data["estimation"]
 
-    record = PlanRecord(
+    record = plan_service.build_record(
+        filename=filename,
+        stored_path=upload.path,
+        analysis=analysis,
+        summary=data["summary"],
+        content_hash=upload.content_hash,
+        analysis_key=analysis_key,
+    )
+    session.add(record)
+    session.commit()
+    session.refresh(record)
+
+    return _plan_create_response(record, analysis.measurements, data["estimation"])
+
+
+@router.post(
+    "/jobs",
+    response_model=PlanJobSchema,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def upload_plan_job(
+    *,
+    file: UploadFile = File(...),
+    coverage: float = Form(1.0),
+    session: Session = Depends(get_db_session),
+    plan_service: PlanService = Depends(get_plan_service),
+) -> PlanJobSchema:
+    """Queue the analysis on the worker pool; poll ``GET /plans/jobs/{id}``."""
+    _check_suffix(file)
+    upload = _store_upload(file)
+    analysis_key = plan_service.analysis_key(upload.content_hash)
+
+    job = PlanJob(
         filename=file.filename,
-        stored_path=str(temp_path),
-        measurement_count=summary.measurement_count,
-        total_area_m2=summary.total_area_m2,
-        total_length_m=summary.total_length_m,
-        dominant_label=summary.dominant_label,
-        measurements_json=plan_service.measurements_to_json(analysis.measurements),
+        stored_path=str(upload.path),
+        coverage=coverage,
+        content_hash=upload.content_hash,
+        analysis_key=analysis_key,
+    )
+    try:
+        cached = _find_cached_plan(session, analysis_key)
+        if cached is not None:
+            job.status, job.stage, job.progress, job.plan_id = "done", "terminé", 1.0, cached.id
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+    finally:
+        # A queued job keeps the file: it is pending in the database.
+        _release_upload(session, upload.path)
+
+    if cached is None:
+        submit_plan_job(job.id)
+    return _job_schema(job)
+
+
+@router.get("/jobs/{job_id}", response_model=PlanJobSchema)
+def get_plan_job(job_id: int, session: Session = Depends(get_db_session)) -> PlanJobSchema:
+    job = session.get(PlanJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Analyse introuvable.")
+    return _job_schema(job)
+
+
+@router.post("/stream")
+def stream_plan_analysis(
+    *,
+    file: UploadFile = File(...),
+    coverage: float = Form(1.0),
+    plan_service: PlanService = Depends(get_plan_service),
+) -> StreamingResponse:
+    """Analyze a plan and stream progress as NDJSON, one event per line.
+
+    Events: ``upload``, ``page`` (measurements of each page as it is read),
+    ``rooms``, ``summary``, then ``done`` with the same body as ``POST /plans``,
+    or ``error``.
+    """
+    _check_suffix(file)
+    upload = _store_upload(file)
+    events = _analysis_events(plan_service, file.filename, upload, coverage)
+    # Run the generator up to its first event, inside the block that releases
+    # the upload: closing or collecting it now releases the upload even if the
+    # response is never streamed (client gone, send failed).
+    first = next(events)
+    return StreamingResponse(
+        itertools.chain([first], events),
+        media_type="application/x-ndjson",
+    )
+
+
+def _analysis_events(
+    plan_service: PlanService,
+    filename: str,
+    upload: StoredUpload,
+    coverage: float,
+) -> Iterator[bytes]:
+    # The request-scoped session is closed once the endpoint returns, before
+    # this generator runs: use a session of our own.
+    with get_session() as session:
+        try:
+            yield _ndjson("upload", filename=filename, size_bytes=upload.size)
+            try:
+                yield from _analysis_stream(session, plan_service, filename, upload, coverage)
+            except Exception as exc:
+                # Headers are sent already: report the failure as the last event.
+                if not isinstance(exc, RuntimeError):
+                    log_info(f"Analyse en flux de {filename} en échec: {exc!r}")
+                yield _ndjson("error", detail=str(exc) or repr(exc))
+        finally:
+            _release_upload(session, upload.path)
+
+
+def _analysis_stream(
+    session: Session,
+    plan_service: PlanService,
+    filename: str,
+    upload: StoredUpload,
+    coverage: float,
+) -> Iterator[bytes]:
+    analysis_key = plan_service.analysis_key(upload.content_hash)
+    cached = _find_cached_plan(session, analysis_key)
+    if cached is not None:
+        measurements = plan_service.measurements_from_json(cached.measurements_json)
+        response = _plan_create_response(
+            cached, measurements, plan_service.estimate(measurements, coverage)
+        )
+        yield _ndjson("done", cached=True, plan=jsonable_encoder(response))
+        return
+
+    measurement_count = 0
+    result: Optional[Tuple[PlanAnalysis, dict]] = None
+    for kind, payload in plan_service.iter_analysis(upload.path, coverage):
+        if kind == "page":
+            measurement_count += len(payload.measurements)
+            yield _ndjson(
+                "page",
+                page=payload.page,
+                engine=payload.engine,
+                measurements=_measurement_dicts(payload.measurements),
+                measurement_count=measurement_count,
+            )
+        elif kind == "rooms":
+            yield _ndjson("rooms", measurements=_measurement_dicts(payload))
+        elif kind == "result":
+            result = payload
+    if result is None:
+        raise RuntimeError("L'analyse s'est terminée sans résultat.")
+
+    analysis, data = result
+    summary, estimation = data["summary"], data["estimation"]
+    yield _ndjson("summary", summary=asdict(summary), estimation=estimation)
+
+    record = plan_service.build_record(
+        filename=filename,
+        stored_path=upload.path,
+        analysis=analysis,
+        summary=summary,
+        content_hash=upload.content_hash,
+        analysis_key=analysis_key,
     )
     session.add(record)
     session.commit()
     session.refresh(record)
+    response = _plan_create_response(record, analysis.measurements, estimation)
+    yield _ndjson("done", cached=False, plan=jsonable_encoder(response))
+
+
+def _ndjson(event: str, **payload: Any) -> bytes:
+    return (json.dumps({"event": event, **payload}, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _measurement_dicts(measurements: List[PlanMeasurement]) -> List[dict]:
+    return [asdict(m) for m in measurements]
+
+
+def _job_schema(job: PlanJob) -> PlanJobSchema:
+    return PlanJobSchema(
+        id=job.id,
+        filename=job.filename,
+        status=job.status,
+        stage=job.stage,
+        progress=job.progress,
+        error=job.error,
+        plan_id=job.plan_id,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
 
-    measurements = [MeasurementSchema(**m.__dict__) for m in analysis.measurements]
+
+def _check_suffix(file: UploadFile) -> None:
+    suffix = Path(file.filename).suffix.lower()
+    if suffix not in {".pdf", ".png", ".jpg", ".jpeg"}:
+        raise HTTPException(status_code=400, detail="Format supporté: PDF, PNG, JPG.")
+
+
+def _find_cached_plan(session: Session, analysis_key: str) -> Optional[PlanRecord]:
+    """Return a previous analysis of the same content and reader settings."""
+    return session.exec(
+        select(PlanRecord)
+        .where(PlanRecord.analysis_key == analysis_key)
+        .order_by(PlanRecord.created_at.desc())
+    ).first()
+
+
+def _store_upload(file: UploadFile) -> StoredUpload:
+    try:
+        return store_upload(file.file, file.filename)
+    except UploadTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+
+
+def _release_upload(session: Session, upload_path: Path) -> None:
+    """Release a request's upload; delete it unless something still uses it.
+
+    Uploads are stored by content, so several analyses can share one file.
+    It is kept while another request holds it, or while a plan or a running
+    job refers to it (a failed analysis or a duplicate of a cached plan is
+    dropped).
+    """
+    release_upload(
+        upload_path, discard=True, in_use=lambda: upload_in_use(session, str(upload_path))
+    )
+
+
+def _plan_create_response(
+    record: PlanRecord, measurements: List[PlanMeasurement], estimation: dict
+) -> PlanCreateResponse:
     return PlanCreateResponse(
         id=record.id,
         filename=record.filename,
@@ -83,7 +314,7 @@ def upload_plan(
         total_area_m2=record.total_area_m2,
         total_length_m=record.total_length_m,
         dominant_label=record.dominant_label,
-        measurements=measurements,
+        measurements=[MeasurementSchema(**m.__dict__) for m in measurements],
         estimation_total_area_m2=estimation["total_area_m2"],
         estimation_units=estimation["estimated_units"],
     )
@@ -1,17 +1,38 @@
 from __future__ import annotations
 
 import json
-from typing import List
+from datetime import datetime, timedelta
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
 from sqlmodel import Session, select
 
+from price_ai.async_price_service import product_key
+
 from ..database import get_db_session
-from ..models import PlanRecord, PriceRequestRecord
-from ..schemas import PriceRequestCreate, PriceRequestSchema, PriceResultSchema
+from ..models import PlanRecord, PriceObservation, PriceRequestRecord
+from ..schemas import (
+    PriceHistoryPointSchema,
+    PriceObservationSchema,
+    PriceRequestCreate,
+    PriceRequestSchema,
+    PriceResultSchema,
+)
 from ..services.price_service import BackendPriceService
 
 router = APIRouter(prefix="/plans/{plan_id}/prices", tags=["prices"])
+history_router = APIRouter(prefix="/prices", tags=["prices"])
+
+# SQLite expressions grouping observations into history buckets. A week is
+# labelled by the date of its Monday: strftime's %W numbers weeks within the
+# year, which splits the week around 1 January into two buckets.
+HISTORY_BUCKETS = {
+    "day": lambda column: func.strftime("%Y-%m-%d", column),
+    "week": lambda column: func.date(column, "weekday 0", "-6 days"),
+    "month": lambda column: func.strftime("%Y-%m", column),
+}
 
 
 def get_price_service() -> BackendPriceService:
@@ -32,12 +53,33 @@ def _serialize_results(store_prices) -> List[PriceResultSchema]:
 
 
 @router.post("", response_model=PriceRequestSchema)
-def request_prices(
+async def request_prices(
     plan_id: int,
     payload: PriceRequestCreate,
     session: Session = Depends(get_db_session),
     price_service: BackendPriceService = Depends(get_price_service),
 ) -> PriceRequestSchema:
+    # Only the lookup runs on the event loop; SQLite work goes to the threadpool.
+    query = await run_in_threadpool(_price_query, session, plan_id, payload)
+    try:
+        store_prices = await price_service.alookup(query)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
+    record = await run_in_threadpool(
+        _save_price_request, session, plan_id, query, store_prices
+    )
+
+    results = _serialize_results(store_prices)
+    return PriceRequestSchema(
+        id=record.id,
+        plan_id=record.plan_id,
+        query=record.query,
+        created_at=record.created_at,
+        results=results,
+    )
+
+
+def _price_query(session: Session, plan_id: int, payload: PriceRequestCreate) -> str:
     plan = session.get(PlanRecord, plan_id)
     if not plan:
         raise HTTPException(status_code=404, detail="Plan introuvable.")
@@ -48,25 +90,25 @@ def request_prices(
             status_code=400,
             detail="Impossible de déduire une requête. Fournissez le champ 'query'.",
         )
+    return query
 
-    store_prices = price_service.lookup(query)
+
+def _save_price_request(
+    session: Session, plan_id: int, query: str, store_prices
+) -> PriceRequestRecord:
     record = PriceRequestRecord(
-        plan_id=plan.id,
+        plan_id=plan_id,
         query=query,
         results_json=BackendPriceService.serialize(store_prices),
     )
     session.add(record)
+    session.flush()
+    session.add_all(
+        BackendPriceService.observations(query, store_prices, request_id=record.id)
+    )
     session.commit()
     session.refresh(record)
-
-    results = _serialize_results(store_prices)
-    return PriceRequestSchema(
-        id=record.id,
-        plan_id=record.plan_id,
-        query=record.query,
-        created_at=record.created_at,
-        results=results,
-    )
+    return record
 
 
 @router.get("", response_model=List[PriceRequestSchema])
@@ -96,3 +138,90 @@ def list_price_requests(
             )
         )
     return items
+
+
+@history_router.get("/latest", response_model=List[PriceObservationSchema])
+def latest_prices(
+    product: str = Query(..., min_length=1),
+    store: Optional[str] = None,
+    session: Session = Depends(get_db_session),
+) -> List[PriceObservationSchema]:
+    """Most recent observed price of a product in each store."""
+    key = product_key(product)
+    filters = [PriceObservation.product_key == key]
+    if store:
+        filters.append(PriceObservation.store == store)
+    # One row per store: the latest observation, the last inserted one when
+    # several share its timestamp.
+    ranked = (
+        select(
+            PriceObservation.id,
+            func.row_number()
+            .over(
+                partition_by=PriceObservation.store,
+                order_by=(PriceObservation.observed_at.desc(), PriceObservation.id.desc()),
+            )
+            .label("rank"),
+        )
+        .where(*filters)
+        .subquery()
+    )
+    rows = session.exec(
+        select(PriceObservation)
+        .join(ranked, PriceObservation.id == ranked.c.id)
+        .where(ranked.c.rank == 1)
+        .order_by(PriceObservation.store)
+    ).all()
+    return [
+        PriceObservationSchema(
+            store=row.store,
+            product_key=row.product_key,
+            url=row.url,
+            value_eur=row.value_eur,
+            source=row.source,
+            observed_at=row.observed_at,
+        )
+        for row in rows
+    ]
+
+
+@history_router.get("/history", response_model=List[PriceHistoryPointSchema])
+def price_history(
+    product: str = Query(..., min_length=1),
+    store: Optional[str] = None,
+    bucket: Literal["day", "week", "month"] = "day",
+    days: int = Query(90, ge=1, le=3650),
+    session: Session = Depends(get_db_session),
+) -> List[PriceHistoryPointSchema]:
+    """Min/avg/max price per store and time bucket over the last ``days`` days."""
+    period = HISTORY_BUCKETS[bucket](PriceObservation.observed_at)
+    filters = [
+        PriceObservation.product_key == product_key(product),
+        PriceObservation.observed_at >= datetime.utcnow() - timedelta(days=days),
+    ]
+    if store:
+        filters.append(PriceObservation.store == store)
+    rows = session.exec(
+        select(
+            PriceObservation.store,
+            period.label("bucket"),
+            func.min(PriceObservation.value_eur),
+            func.avg(PriceObservation.value_eur),
+            func.max(PriceObservation.value_eur),
+            func.count(),
+        )
+        .where(*filters)
+        .group_by(PriceObservation.store, period)
+        .order_by(PriceObservation.store, period)
+    ).all()
+    return [
+        PriceHistoryPointSchema(
+            store=row_store,
+            bucket=row_bucket,
+            min_eur=min_eur,
+            avg_eur=round(avg_eur, 2),
+            max_eur=max_eur,
+            count=count,
+        )
+        for row_store, row_bucket, min_eur, avg_eur, max_eur, count in rows
+    ]
@@ -12,6 +12,7 @@ class MeasurementSchema(BaseModel):
     length_m: Optional[float] = None
     width_m: Optional[float] = None
     source: Optional[str] = None
+    page: Optional[int] = None
 
 
 class PlanSummarySchema(BaseModel):
@@ -33,6 +34,18 @@ class PlanCreateResponse(PlanDetailSchema):
     estimation_units: float
 
 
+class PlanJobSchema(BaseModel):
+    id: int
+    filename: str
+    status: str
+    stage: Optional[str]
+    progress: float
+    error: Optional[str]
+    plan_id: Optional[int]
+    created_at: datetime
+    updated_at: datetime
+
+
 class PriceResultSchema(BaseModel):
     store: str
     title: str
@@ -51,3 +64,21 @@ class PriceRequestSchema(BaseModel):
 
 class PriceRequestCreate(BaseModel):
     query: Optional[str] = None
+
+
+class PriceObservationSchema(BaseModel):
+    store: str
+    product_key: str
+    url: str
+    value_eur: float
+    source: str
+    observed_at: datetime
+
+
+class PriceHistoryPointSchema(BaseModel):
+    store: str
+    bucket: str
+    min_eur: float
+    avg_eur: float
+    max_eur: float
+    count: int
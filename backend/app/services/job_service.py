@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from sqlmodel import Session, select
+
+from shared.utils import log_info
+
+from ..config import PLAN_JOB_WORKERS
+from ..database import engine, get_session
+from ..models import PlanJob, PlanRecord
+from ..storage import discard_upload
+from .plan_service import PlanService
+
+ACTIVE_STATUSES = ("pending", "running")
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _init_worker() -> None:
+    # Connections inherited through fork must not be shared with the parent.
+    engine.dispose()
+
+
+def get_job_executor() -> ProcessPoolExecutor:
+    """Process pool running plan analyses: OCR and OpenCV are CPU-bound."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=PLAN_JOB_WORKERS, initializer=_init_worker
+        )
+    return _executor
+
+
+def shutdown_job_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def submit_plan_job(job_id: int) -> None:
+    future = get_job_executor().submit(run_plan_job, job_id)
+    future.add_done_callback(lambda done: _on_job_finished(job_id, done))
+
+
+def fail_interrupted_jobs() -> None:
+    """Fail the active jobs whose server process is gone: they will never complete.
+
+    Jobs of other running server processes (``uvicorn --workers``) are left
+    alone. Liveness is probed on POSIX only; elsewhere every active job is
+    failed, so run a single server process there.
+    """
+    with get_session() as session:
+        jobs = session.exec(select(PlanJob).where(PlanJob.status.in_(ACTIVE_STATUSES))).all()
+        interrupted = [job for job in jobs if not _process_exists(job.owner_pid)]
+        for job in interrupted:
+            job.status = "failed"
+            job.error = "Analyse interrompue par un redémarrage du serveur."
+            job.updated_at = datetime.utcnow()
+            session.add(job)
+        session.commit()
+        for job in interrupted:
+            _discard_job_upload(session, job)
+
+
+def upload_in_use(session: Session, stored_path: str) -> bool:
+    """Whether a plan or an active job refers to the uploaded file."""
+    return (
+        session.exec(select(PlanRecord.id).where(PlanRecord.stored_path == stored_path)).first()
+        or session.exec(
+            select(PlanJob.id).where(
+                PlanJob.stored_path == stored_path, PlanJob.status.in_(ACTIVE_STATUSES)
+            )
+        ).first()
+    ) is not None
+
+
+def update_job(job_id: int, **fields: Any) -> None:
+    with get_session() as session:
+        job = session.get(PlanJob, job_id)
+        if job is None:
+            return
+        for name, value in fields.items():
+            setattr(job, name, value)
+        job.updated_at = datetime.utcnow()
+        session.add(job)
+        session.commit()
+
+
+def run_plan_job(job_id: int) -> None:
+    """Worker entry point: analyze the uploaded plan and store a PlanRecord."""
+    with get_session() as session:
+        job = session.get(PlanJob, job_id)
+        if job is None:
+            return
+        stored_path = Path(job.stored_path)
+        coverage = job.coverage
+        filename = job.filename
+        content_hash = job.content_hash
+        analysis_key = job.analysis_key
+
+    update_job(job_id, status="running", stage="démarrage", progress=0.0)
+    plan_service = PlanService()
+    try:
+        analysis, data = plan_service.analyze_plan(
+            stored_path,
+            coverage,
+            on_progress=lambda stage, progress: update_job(
+                job_id, stage=stage, progress=progress
+            ),
+        )
+    except RuntimeError as exc:
+        update_job(job_id, status="failed", error=str(exc))
+        return
+
+    record = plan_service.build_record(
+        filename=filename,
+        stored_path=stored_path,
+        analysis=analysis,
+        summary=data["summary"],
+        content_hash=content_hash,
+        analysis_key=analysis_key,
+    )
+    with get_session() as session:
+        session.add(record)
+        session.commit()
+        session.refresh(record)
+        plan_id = record.id
+    update_job(job_id, status="done", stage="terminé", progress=1.0, plan_id=plan_id)
+
+
+def _on_job_finished(job_id: int, future: Future) -> None:
+    if future.cancelled():
+        update_job(job_id, status="failed", error="Analyse annulée.")
+    else:
+        error = future.exception()
+        if error is not None:
+            log_info(f"Job d'analyse #{job_id} en échec: {error!r}")
+            update_job(job_id, status="failed", error=str(error) or repr(error))
+    # Whatever the outcome: a plan keeps the file, a failed job does not.
+    with get_session() as session:
+        job = session.get(PlanJob, job_id)
+        if job is not None:
+            _discard_job_upload(session, job)
+
+
+def _discard_job_upload(session: Session, job: PlanJob) -> None:
+    discard_upload(
+        Path(job.stored_path), in_use=lambda: upload_in_use(session, job.stored_path)
+    )
+
+
+def _process_exists(pid: Optional[int]) -> bool:
+    if pid is None or os.name != "posix":
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -2,40 +2,128 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import List, Tuple
+from typing import Any, Callable, Iterator, List, Optional, Tuple
 
 from plan_ai.geometry_calculator import (
+    SurfaceSummary,
     estimate_material_requirements,
     summarize_measurements,
 )
-from plan_ai.plan_reader import PlanAnalysis, PlanReader
+from plan_ai.plan_image import PlanImage
+from plan_ai.plan_reader import PlanAnalysis, PlanReader, collect_analysis
 from plan_ai.room_detector import RoomDetector
-from plan_ai.models import PlanMeasurement
+from plan_ai.models import PlanMeasurement, PlanPage
 from shared.utils import log_info
 
+from ..config import (
+    OCR_ENGINE,
+    PDF_EXTRACT_WORKERS,
+    ROOM_DETECT_MAX_SIDE_PX,
+    ROOM_DETECT_WORKERS,
+)
+from ..models import PlanRecord
+
+ProgressCallback = Callable[[str, float], None]
+AnalysisEvent = Tuple[str, Any]
+
+STAGE_PROGRESS = {"lecture": 0.05, "détection des pièces": 0.7, "synthèse": 0.9}
+
 
 class PlanService:
     def __init__(self) -> None:
-        self.reader = PlanReader()
-        self.detector = RoomDetector()
-
-    def analyze_plan(self, plan_path: Path, coverage: float) -> Tuple[PlanAnalysis, dict]:
-        analysis = self.reader.read(plan_path)
-        analysis.measurements.extend(
-            self._augment_with_room_detection(analysis, plan_path)
+        self.reader = PlanReader(workers=PDF_EXTRACT_WORKERS, ocr_engine=OCR_ENGINE)
+        self.detector = RoomDetector(
+            max_side_px=ROOM_DETECT_MAX_SIDE_PX or None, workers=ROOM_DETECT_WORKERS
         )
+
+    def analyze_plan(
+        self,
+        plan_path: Path,
+        coverage: float,
+        *,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Tuple[PlanAnalysis, dict]:
+        report = on_progress or (lambda stage, progress: None)
+        for kind, payload in self.iter_analysis(plan_path, coverage):
+            if kind == "stage":
+                report(payload, STAGE_PROGRESS[payload])
+            elif kind == "result":
+                return payload
+        raise RuntimeError(f"Analyse incomplète: {plan_path.name}")
+
+    def iter_analysis(self, plan_path: Path, coverage: float) -> Iterator[AnalysisEvent]:
+        """Run an analysis step by step.
+
+        Yields ``("stage", name)`` when a stage starts, ``("page", PlanPage)``
+        as each page is parsed, ``("rooms", measurements)`` after room
+        detection and finally ``("result", (analysis, data))``.
+        """
+        yield "stage", "lecture"
+        # Raster plans are decoded once; OCR and room detection share the grayscale frame.
+        image = PlanImage.load(plan_path) if PlanImage.is_image(plan_path) else None
+        pages: List[PlanPage] = []
+        for page in self.reader.iter_pages(plan_path, image=image):
+            pages.append(page)
+            yield "page", page
+        analysis = collect_analysis(plan_path, pages)
+
+        yield "stage", "détection des pièces"
+        rooms = self._augment_with_room_detection(analysis, image)
+        analysis.measurements.extend(rooms)
+        yield "rooms", rooms
+
+        yield "stage", "synthèse"
         summary = summarize_measurements(analysis.measurements)
-        estimation = estimate_material_requirements(
-            analysis.measurements, coverage_per_unit_m2=max(coverage, 0.1)
-        )
+        estimation = self.estimate(analysis.measurements, coverage)
         log_info(
             f"Plan analysé: {plan_path.name} | mesures={summary.measurement_count} | "
             f"surface={summary.total_area_m2:.2f} m²"
         )
-        return analysis, {
-            "summary": summary,
-            "estimation": estimation,
-        }
+        yield "result", (
+            analysis,
+            {
+                "summary": summary,
+                "estimation": estimation,
+            },
+        )
+
+    def build_record(
+        self,
+        *,
+        filename: str,
+        stored_path: Path,
+        analysis: PlanAnalysis,
+        summary: SurfaceSummary,
+        content_hash: Optional[str] = None,
+        analysis_key: Optional[str] = None,
+    ) -> PlanRecord:
+        return PlanRecord(
+            filename=filename,
+            stored_path=str(stored_path),
+            measurement_count=summary.measurement_count,
+            total_area_m2=summary.total_area_m2,
+            total_length_m=summary.total_length_m,
+            dominant_label=summary.dominant_label,
+            measurements_json=self.measurements_to_json(analysis.measurements),
+            content_hash=content_hash,
+            analysis_key=analysis_key,
+        )
+
+    def analysis_key(self, content_hash: str) -> str:
+        """Memoization key: file content plus every setting that shapes the result."""
+        settings = {**self.reader.settings, **self.detector.settings}
+        fingerprint = ",".join(f"{name}={settings[name]}" for name in sorted(settings))
+        return f"{content_hash}:{fingerprint}"
+
+    @staticmethod
+    def estimate(measurements: List[PlanMeasurement], coverage: float) -> dict:
+        return estimate_material_requirements(
+            measurements, coverage_per_unit_m2=max(coverage, 0.1)
+        )
+
+    @staticmethod
+    def measurements_from_json(raw: str) -> List[PlanMeasurement]:
+        return [PlanMeasurement(**item) for item in json.loads(raw)]
 
     @staticmethod
     def measurements_to_json(measurements: List[PlanMeasurement]) -> str:
@@ -47,6 +135,7 @@ class PlanService:
                     "length_m": m.length_m,
                     "width_m": m.width_m,
                     "source": m.source,
+                    "page": m.page,
                 }
                 for m in measurements
             ],
@@ -54,12 +143,12 @@ class PlanService:
         )
 
     def _augment_with_room_detection(
-        self, analysis: PlanAnalysis, plan_path: Path
+        self, analysis: PlanAnalysis, image: Optional[PlanImage]
     ) -> List[PlanMeasurement]:
-        if plan_path.suffix.lower() not in {".png", ".jpg", ".jpeg"}:
+        if image is None:
             return []
 
-        rooms = self.detector.detect(plan_path)
+        rooms = self.detector.detect(image)
         if not rooms:
             return []
 
@@ -1,17 +1,152 @@
 from __future__ import annotations
 
 import json
-from typing import List
+from typing import List, Optional
 
-from price_ai.price_service import PriceLookupService, StorePrice
+from price_ai.async_price_service import AsyncPriceLookupService, product_key
+from price_ai.http_transport import HttpTransport, TransportConfig, parse_host_pool_sizes
+from price_ai.page_cache import PageCache
+from price_ai.price_service import StorePrice
+from price_ai.rate_limit import SearchThrottle, open_search_throttle
+from price_ai.search_cache import TieredSearchCache, open_search_cache
+
+from ..config import (
+    CACHE_DIR,
+    GOOGLE_DAILY_QUOTA,
+    GOOGLE_QUOTA_RESERVE,
+    GOOGLE_SEARCH_BURST,
+    GOOGLE_SEARCH_RATE_PER_S,
+    HTTP2_ENABLED,
+    HTTP_HOST_POOL_SIZES,
+    HTTP_KEEPALIVE_EXPIRY_S,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    HTTP_RETRIES,
+    PAGE_CACHE_MAX_BYTES,
+    PAGE_MAX_BYTES,
+    PRICE_LOOKUP_DEADLINE_S,
+    SEARCH_CACHE_TTL_S,
+    SNIPPET_CONFIDENCE_THRESHOLD,
+)
+from ..models import PriceObservation
+
+_shared_async_service: Optional[AsyncPriceLookupService] = None
+_search_cache: Optional[TieredSearchCache] = None
+_page_cache: Optional[PageCache] = None
+_search_throttle: Optional[SearchThrottle] = None
+_http_transport: Optional[HttpTransport] = None
+
+
+def get_http_transport() -> HttpTransport:
+    """Pooled HTTP clients shared by every Google and store request."""
+    global _http_transport
+    if _http_transport is None:
+        _http_transport = HttpTransport(
+            TransportConfig(
+                pool_maxsize=HTTP_POOL_MAXSIZE,
+                host_pool_sizes=parse_host_pool_sizes(HTTP_HOST_POOL_SIZES),
+                max_connections=HTTP_MAX_CONNECTIONS,
+                keepalive_expiry_s=HTTP_KEEPALIVE_EXPIRY_S,
+                http2=HTTP2_ENABLED,
+                retries=HTTP_RETRIES,
+            )
+        )
+    return _http_transport
+
+
+def get_search_cache() -> TieredSearchCache:
+    """Google result cache shared by every lookup; persisted under CACHE_DIR."""
+    global _search_cache
+    if _search_cache is None:
+        _search_cache = open_search_cache(
+            CACHE_DIR / "google_search.sqlite3", ttl_s=SEARCH_CACHE_TTL_S
+        )
+    return _search_cache
+
+
+def get_page_cache() -> PageCache:
+    """Store page cache used for conditional GETs, bounded by PAGE_CACHE_MAX_BYTES."""
+    global _page_cache
+    if _page_cache is None:
+        _page_cache = PageCache(CACHE_DIR / "pages.sqlite3", max_bytes=PAGE_CACHE_MAX_BYTES)
+    return _page_cache
+
+
+def get_search_throttle() -> SearchThrottle:
+    """Google rate limit and daily quota, persisted so every process shares them."""
+    global _search_throttle
+    if _search_throttle is None:
+        _search_throttle = open_search_throttle(
+            CACHE_DIR / "google_quota.sqlite3",
+            rate_per_s=GOOGLE_SEARCH_RATE_PER_S,
+            burst=GOOGLE_SEARCH_BURST,
+            daily_limit=GOOGLE_DAILY_QUOTA,
+            reserve=GOOGLE_QUOTA_RESERVE,
+        )
+    return _search_throttle
+
+
+def get_shared_async_service() -> AsyncPriceLookupService:
+    """Process-wide async lookup service, so its connection pool is reused."""
+    global _shared_async_service
+    if _shared_async_service is None:
+        _shared_async_service = AsyncPriceLookupService(
+            transport=get_http_transport(),
+            cache=get_search_cache(),
+            page_cache=get_page_cache(),
+            page_max_bytes=PAGE_MAX_BYTES,
+            snippet_threshold=SNIPPET_CONFIDENCE_THRESHOLD,
+            throttle=get_search_throttle(),
+        )
+    return _shared_async_service
+
+
+async def close_shared_async_service() -> None:
+    """Close the shared async service and both clients of the HTTP transport."""
+    global _shared_async_service, _http_transport
+    if _shared_async_service is not None:
+        await _shared_async_service.aclose()
+        _shared_async_service = None
+    if _http_transport is not None:
+        await _http_transport.aclose()
+        _http_transport.close()
+        _http_transport = None
 
 
 class BackendPriceService:
-    def __init__(self) -> None:
-        self.service = PriceLookupService()
+    def __init__(
+        self, *, async_service: Optional[AsyncPriceLookupService] = None
+    ) -> None:
+        self._async_service = async_service
 
-    def lookup(self, query: str, *, per_store_results: int = 3) -> List[StorePrice]:
-        return self.service.lookup(query, per_store_results=per_store_results)
+    async def alookup(
+        self, query: str, *, per_store_results: int = 3
+    ) -> List[StorePrice]:
+        service = self._async_service or get_shared_async_service()
+        return await service.lookup(
+            query,
+            per_store_results=per_store_results,
+            deadline_s=PRICE_LOOKUP_DEADLINE_S,
+        )
+
+    @staticmethod
+    def observations(
+        query: str, store_prices: List[StorePrice], *, request_id: Optional[int] = None
+    ) -> List[PriceObservation]:
+        """One history row per store that returned a price."""
+        key = product_key(query)
+        return [
+            PriceObservation(
+                product_key=key,
+                store=sp.store.name,
+                url=sp.result.link if sp.result else "",
+                value_eur=sp.price.value_eur,
+                source=sp.source,
+                request_id=request_id,
+            )
+            for sp in store_prices
+            if sp.price is not None
+        ]
 
     @staticmethod
     def serialize(store_prices: List[StorePrice]) -> str:
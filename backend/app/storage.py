@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Callable
+
+from .config import MAX_UPLOAD_BYTES, UPLOAD_DIR, UPLOAD_FSYNC
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Requests currently using each stored file. Identical uploads share one
+# file, so a failed analysis may only delete it once nobody else holds it.
+_upload_references: Counter = Counter()
+_upload_lock = threading.Lock()
+
+
+class UploadTooLargeError(RuntimeError):
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(f"Fichier trop volumineux (maximum {max_bytes // (1024 * 1024)} Mo).")
+        self.max_bytes = max_bytes
+
+
+@dataclass
+class StoredUpload:
+    path: Path
+    content_hash: str
+    size: int
+
+
+def store_upload(
+    source: BinaryIO,
+    filename: str,
+    *,
+    directory: Path = UPLOAD_DIR,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    fsync: bool = UPLOAD_FSYNC,
+) -> StoredUpload:
+    """Stream ``source`` into content-addressed storage.
+
+    The data goes to a private temporary file while its BLAKE2b digest is
+    computed, and the copy stops as soon as it exceeds ``max_bytes``. The file
+    is then renamed atomically to ``<digest><suffix>``, so concurrent uploads
+    never see a partial file and identical content is stored once. With
+    ``fsync`` the data and the rename are flushed to disk first.
+
+    The caller holds a reference on the stored file until it calls
+    :func:`release_upload`.
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    size = 0
+    temp_path = directory / f".upload-{uuid.uuid4().hex}.part"
+    try:
+        with temp_path.open("wb") as buffer:
+            while True:
+                chunk = source.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                digest.update(chunk)
+                buffer.write(chunk)
+            if fsync:
+                buffer.flush()
+                os.fsync(buffer.fileno())
+
+        content_hash = digest.hexdigest()
+        destination = directory / f"{content_hash}{Path(filename).suffix.lower()}"
+        with _upload_lock:
+            if destination.exists():
+                temp_path.unlink()
+            else:
+                os.replace(temp_path, destination)
+                if fsync:
+                    _fsync_directory(directory)
+            _upload_references[destination] += 1
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return StoredUpload(path=destination, content_hash=content_hash, size=size)
+
+
+def release_upload(
+    path: Path, *, discard: bool = False, in_use: Callable[[], bool] = lambda: False
+) -> None:
+    """Drop the reference taken by :func:`store_upload`.
+
+    With ``discard`` the file is deleted when no other request holds it and
+    ``in_use()`` (e.g. a database lookup) is false. Both are checked under the
+    lock that :func:`store_upload` takes, so a concurrent upload of the same
+    content either keeps the file or recreates it. The references are per
+    process: with several server processes, ``in_use`` is the only guard.
+    """
+    with _upload_lock:
+        _upload_references[path] -= 1
+        if _upload_references[path] > 0:
+            return
+        del _upload_references[path]
+        if discard and not in_use():
+            path.unlink(missing_ok=True)
+
+
+def discard_upload(path: Path, *, in_use: Callable[[], bool]) -> None:
+    """Delete ``path`` unless a request holds it or ``in_use()`` is true.
+
+    For owners that hold no reference of their own, such as a finished job.
+    """
+    with _upload_lock:
+        if _upload_references[path] <= 0 and not in_use():
+            path.unlink(missing_ok=True)
+
+
+def _fsync_directory(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:  # pragma: no cover - not supported on Windows
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
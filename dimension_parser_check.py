@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, List
+
+from plan_ai.dimension_parser import parse_measurements_from_text
+from plan_ai.dimension_parser_reference import parse_measurements_reference
+
+# Hand-picked inputs around the grammar's edge cases: greedy labels, label
+# runs touching numbers, units glued to words, decimals, repeated tokens.
+CORPUS = [
+    "",
+    "Salon: 12,5 m²",
+    "Salon : 12,5 m2 Cuisine - 9 m²",
+    "Chambre 1 3 m x 4,20 m",
+    "Chambre 1 300 cm × 420 cm",
+    "Séjour 25m²Cuisine 8m2",
+    "12 m² salon",
+    "12 m² salon 4 m couloir",
+    "(WC) - 1,8 m",
+    "Dégagement 1.20 x 3 m",
+    "Largeur 90cm hauteur 2,10m",
+    "Terrain 1 250 m²",
+    "mur 12mm épais 3 m",
+    "2 m x 3 m x 4 m",
+    "RDC\nSalon 20 m²\nCuisine 10 m²\nTotal 30 m²",
+    "abc def " * 40 + "5 m",
+    "7" * 200 + " m",
+    "1 2 3 " * 30 + "4 m2 garage",
+    "Salon: 12,5 m² Salon: 12,5 m²",
+    "m² 12 m2 m 3 cm",
+    "Garage-3m-4m",
+    "Bureau 3,5 m x 2,8 m - surface 9,8 m² (hors placard)",
+]
+
+TOKENS = [
+    "Salon", "Cuisine", "chambre", "Séjour", "WC", "mur", "x", "×", "X",
+    "m", "cm", "m²", "m2", "M", "CM", ":", "-", "(", ")", " ", " ", " ", "\n",
+    ",", ".", "/", "é", "12", "3", "4,5", "0.75", "120", "7", "1 250", "9",
+]
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compare l'analyseur de mesures linéaire à l'ancienne version par "
+            "expressions régulières sur un corpus fixe, des textes aléatoires et "
+            "des fichiers texte fournis (ex: extractions de PDF)."
+        )
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help="Textes supplémentaires à comparer (l'ancienne version est lente sur les gros fichiers).",
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=20_000,
+        help="Nombre de textes aléatoires générés.",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Graine du générateur aléatoire.")
+    return parser.parse_args()
+
+
+def random_texts(iterations: int, seed: int) -> Iterator[str]:
+    rng = random.Random(seed)
+    for _ in range(iterations):
+        yield "".join(rng.choice(TOKENS) for _ in range(rng.randint(1, 40)))
+
+
+def main() -> None:
+    args = parse_arguments()
+    texts: List[str] = list(CORPUS)
+    texts.extend(Path(path).read_text(encoding="utf-8", errors="replace") for path in args.files)
+
+    checked = 0
+    for text in [*texts, *random_texts(args.iterations, args.seed)]:
+        expected = parse_measurements_reference(text)
+        found = parse_measurements_from_text(text)
+        checked += 1
+        if found != expected:
+            print(f"Différence sur {text!r}:\n  attendu {expected}\n  obtenu  {found}")
+            sys.exit(1)
+
+    # Inputs on which the reference is too slow to be compared.
+    for name, text in [
+        ("2 Mo de chiffres", "7" * 2_000_000),
+        ("2 Mo de mots", "abc def " * 250_000),
+    ]:
+        started = time.perf_counter()
+        parse_measurements_from_text(text)
+        print(f"{name}: {time.perf_counter() - started:.2f} s")
+    print(f"{checked} texte(s) identiques à la version de référence")
+
+
+if __name__ == "__main__":
+    main()
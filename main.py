@@ -34,6 +34,12 @@ def parse_arguments() -> argparse.Namespace:
         default=3,
         help="Nombre de résultats Google analysés par magasin (1 à 10).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Nombre de processus pour extraire le texte des PDF multi-pages.",
+    )
     parser.add_argument(
         "--show-table",
         action="store_true",
@@ -52,7 +58,7 @@ def main() -> None:
     load_dotenv()
     args = parse_arguments()
 
-    reader = PlanReader()
+    reader = PlanReader(workers=args.workers)
     analysis = reader.read(args.plan_path)
     summary = summarize_measurements(analysis.measurements)
 
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from .geometry_calculator import SurfaceSummary, summarize_measurements
+from .models import PlanMeasurement
+from .plan_reader import PlanReader
+
+PLAN_SUFFIXES = {".pdf", ".png", ".jpg", ".jpeg"}
+
+
+@dataclass
+class BatchResult:
+    path: str
+    key: str
+    content_hash: str = ""
+    page_count: int = 0
+    measurements: List[PlanMeasurement] = field(default_factory=list)
+    summary: Optional[SurfaceSummary] = None
+    elapsed_s: float = 0.0
+    error: Optional[str] = None
+
+
+def expand_sources(sources: Iterable[str]) -> List[Path]:
+    """Plan files from a mix of files, directories (recursive) and glob patterns."""
+    found: Dict[Path, None] = {}
+    for source in sources:
+        if glob.has_magic(source):
+            candidates = [Path(match) for match in glob.glob(source, recursive=True)]
+        elif Path(source).is_dir():
+            candidates = [path for path in Path(source).rglob("*") if path.is_file()]
+        else:
+            candidates = [Path(source)]
+        for path in sorted(candidates):
+            if path.is_file() and path.suffix.lower() in PLAN_SUFFIXES:
+                found.setdefault(path.resolve(), None)
+    return list(found)
+
+
+def file_key(path: Path) -> str:
+    """Identifies a file version: a modified plan is analysed again on resume."""
+    stat = path.stat()
+    return f"{path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+class BatchCheckpoint:
+    """Append-only JSON lines file of plans whose results were written.
+
+    Failed plans are logged with their error but not counted as done, so the
+    next run retries them.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.done: Set[str] = set()
+        if self.path.exists():
+            with self.path.open(encoding="utf-8") as handle:
+                for line in handle:
+                    line = line.strip()
+                    if line:
+                        entry = json.loads(line)
+                        if not entry.get("error"):
+                            self.done.add(entry["key"])
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.done
+
+    def mark(self, results: Iterable[BatchResult]) -> None:
+        with self.path.open("a", encoding="utf-8") as handle:
+            for result in results:
+                handle.write(json.dumps({"key": result.key, "error": result.error}) + "\n")
+                if not result.error:
+                    self.done.add(result.key)
+            handle.flush()
+            os.fsync(handle.fileno())
+
+
+_reader: Optional[PlanReader] = None
+
+
+def _init_worker(reader_options: Dict[str, Any]) -> None:
+    global _reader
+    _reader = PlanReader(**reader_options)
+
+
+def analyze_file(path: str, key: str) -> BatchResult:
+    """Process-pool worker: read and summarize one plan, never raising."""
+    assert _reader is not None
+    started = time.perf_counter()
+    result = BatchResult(path=path, key=key)
+    try:
+        result.content_hash = _hash_file(Path(path))
+        analysis = _reader.read(path, keep_text=False)
+        result.page_count = analysis.page_count
+        result.measurements = analysis.measurements
+        result.summary = summarize_measurements(analysis.measurements)
+    except Exception as exc:  # one broken archive must not stop the batch
+        result.error = f"{type(exc).__name__}: {exc}"
+    result.elapsed_s = time.perf_counter() - started
+    return result
+
+
+def iter_batch(
+    paths: Iterable[Path],
+    *,
+    workers: int,
+    reader_options: Optional[Dict[str, Any]] = None,
+    skip: Optional[BatchCheckpoint] = None,
+) -> Iterator[BatchResult]:
+    """Analyse ``paths`` on a process pool, yielding results as they complete.
+
+    At most a few plans per worker are in flight, so thousands of paths do not
+    turn into thousands of pending futures.
+    """
+    pending: Set[Future] = set()
+    todo = ((str(path), file_key(path)) for path in paths)
+    todo = (item for item in todo if skip is None or item[1] not in skip)
+    with ProcessPoolExecutor(
+        max_workers=max(1, workers),
+        initializer=_init_worker,
+        initargs=(reader_options or {},),
+    ) as pool:
+        for path, key in todo:
+            pending.add(pool.submit(analyze_file, path, key))
+            if len(pending) >= workers * 4:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from (future.result() for future in done)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            yield from (future.result() for future in done)
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=32)
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
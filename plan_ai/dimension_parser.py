@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import re
-from typing import List, Optional
+from bisect import bisect_right
+from typing import Iterator, List, Match, NamedTuple, Optional, Pattern, Set, Tuple
 
 from .models import PlanMeasurement
 
@@ -34,9 +35,147 @@ LENGTH_TRAILING_PATTERN = re.compile(
     flags=re.IGNORECASE,
 )
 
-def parse_measurements_from_text(text: str) -> List[PlanMeasurement]:
+# The patterns above define the measurement grammar. Running them with
+# ``finditer`` makes the optional greedy label backtrack over every label-like
+# run: quadratic on long PDF dumps. The scanner below returns the same matches
+# without that backtracking: each pattern's number-and-unit core is a
+# label-free pattern (the unit part in a lookahead), tried only at the digit
+# runs one shared pass finds ahead of a unit, and labels are then cut from
+# precomputed label runs.
+_LABEL_RUN = re.compile(r"[A-Za-zÀ-ÿ0-9\s\-\(\)]+", flags=re.IGNORECASE)
+_SPACES = re.compile(r"\s*")
+
+
+def _number_pattern(tail: str) -> Pattern[str]:
+    # A whole digit run (the lookbehind comes after the first digit so the
+    # engine can skip ahead to digits), with the unit part as a lookahead.
+    # The run is taken atomically (lookahead + backreference, as Python 3.10
+    # has no possessive quantifier): a shorter run is followed by a digit and
+    # can never match, and backtracking into it made long digit runs quadratic.
+    return re.compile(
+        r"\d(?<!\d\d)(?=(?P<digits>\d*))(?P=digits)"
+        r"(?=(?P<frac>[.,]\d+)?\s*" + tail + r"(?P<end>))",
+        flags=re.IGNORECASE,
+    )
+
+
+# Every unit above starts with "c" or "m": a digit run followed by anything
+# else cannot start a match of any pattern.
+_UNIT_NUMBER = _number_pattern(r"[cm]")
+_LxW_NUMBER = _number_pattern(
+    r"(?P<unit1>cm|m)\s*[x×]\s*(?P<val2>\d+(?:[.,]\d+)?)\s*(?P<unit2>cm|m)"
+)
+_AREA_NUMBER = _number_pattern(r"(?:m²|m2)\b")
+_AREA_TRAILING_NUMBER = _number_pattern(r"(?:m²|m2)")
+_LENGTH_NUMBER = _number_pattern(r"(?P<unit>m|cm)\b")
+_LENGTH_TRAILING_NUMBER = _number_pattern(r"(?P<unit>m|cm)")
+
+
+class _Number(NamedTuple):
+    prefix_start: int  # first offset from which an optional [:-] and spaces lead here
+    match: Match[str]
+
+
+class _Token(NamedTuple):
+    label: Optional[str]
+    number: str
+    match: Match[str]
+
+
+class _Scanner:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.label_runs = [match.span() for match in _LABEL_RUN.finditer(text)]
+        self.label_starts = [start for start, _ in self.label_runs]
+        self.unit_numbers = [match.start() for match in _UNIT_NUMBER.finditer(text)]
+
+    def matches(self, pattern: Pattern[str]) -> Iterator[Match[str]]:
+        """``pattern.finditer(text)`` for the number patterns, from ``unit_numbers``."""
+        for start in self.unit_numbers:
+            match = pattern.match(self.text, start)
+            if match is not None:
+                yield match
+
+    def numbers(self, pattern: Pattern[str]) -> List[_Number]:
+        text = self.text
+        numbers: List[_Number] = []
+        for match in self.matches(pattern):
+            prefix = match.start()
+            while prefix and text[prefix - 1].isspace():
+                prefix -= 1
+            if prefix and text[prefix - 1] in ":-":
+                prefix -= 1
+            numbers.append(_Number(prefix, match))
+        return numbers
+
+    def label_run(self, offset: int) -> Optional[Tuple[int, int]]:
+        """The label run containing (or ending at) ``offset``."""
+        index = bisect_right(self.label_starts, offset) - 1
+        if index >= 0 and self.label_runs[index][1] >= offset:
+            return self.label_runs[index]
+        return None
+
+    def leading(self, pattern: Pattern[str]) -> Iterator[_Token]:
+        """Matches of "optional label, optional [:-], number, unit", in finditer order."""
+        text = self.text
+        numbers = self.numbers(pattern)
+        prefix_starts = [number.prefix_start for number in numbers]
+        index = 0
+        pos = 0
+        while True:
+            while index < len(numbers) and numbers[index].match.end() <= pos:
+                index += 1
+            if index == len(numbers):
+                return
+            # Leftmost offset where the label-less part matches.
+            number = numbers[index]
+            at = max(pos, number.prefix_start)
+            label: Optional[str] = None
+            run = self.label_run(at)
+            if run is not None:
+                # The greedy label starts as early as possible and stops at the
+                # last offset of its run where the rest still matches.
+                label_start, run_end = max(pos, run[0]), run[1]
+                last = numbers[bisect_right(prefix_starts, run_end) - 1]
+                label_end = min(run_end, last.match.end() - 1)
+                if label_end >= label_start + 2:
+                    label = text[label_start:label_end]
+                    number, at = last, label_end
+            match = number.match
+            value = text[max(at, match.start()) : match.end()] + (match.group("frac") or "")
+            yield _Token(label, value, match)
+            pos = match.end("end")
+
+    def trailing(self, pattern: Pattern[str]) -> Iterator[_Token]:
+        """Matches of "number, unit, label", in finditer order."""
+        text = self.text
+        pos = 0
+        for match in self.matches(pattern):
+            if match.end() <= pos:
+                continue
+            unit_end = match.end("end")
+            run = self.label_run(unit_end)
+            if run is None or run[1] - unit_end < 2:
+                continue
+            run_end = run[1]
+            spaces_end = _SPACES.match(text, unit_end, run_end).end()
+            label = text[min(spaces_end, run_end - 2) : run_end]
+            value = text[max(pos, match.start()) : match.end()] + (match.group("frac") or "")
+            yield _Token(label, value, match)
+            pos = run_end
+
+
+def parse_measurements_from_text(
+    text: str, *, page: Optional[int] = None, seen_tokens: Optional[Set[str]] = None
+) -> List[PlanMeasurement]:
+    """Measurements found in ``text``.
+
+    ``seen_tokens`` can be shared between calls (e.g. the pages of one
+    document) so a measurement already returned is not repeated.
+    """
     measurements: List[PlanMeasurement] = []
-    seen_tokens: set[str] = set()
+    if seen_tokens is None:
+        seen_tokens = set()
 
     def add_measurement(label: str, area: Optional[float], length: Optional[float], width: Optional[float]) -> None:
         token = f"{label}|{area}|{length}|{width}"
@@ -50,34 +189,37 @@ def parse_measurements_from_text(text: str) -> List[PlanMeasurement]:
                 length_m=length,
                 width_m=width,
                 source="text",
+                page=page,
             )
         )
 
-    for match in LxW_PATTERN.finditer(text):
-        label = _sanitize_label(match.group("label"))
-        val1 = _to_meters(match.group("val1"), match.group("unit1"))
-        val2 = _to_meters(match.group("val2"), match.group("unit2"))
+    scanner = _Scanner(text)
+
+    for token in scanner.leading(_LxW_NUMBER):
+        label = _sanitize_label(token.label)
+        val1 = _to_meters(token.number, token.match.group("unit1"))
+        val2 = _to_meters(token.match.group("val2"), token.match.group("unit2"))
         area = val1 * val2
         add_measurement(label, area, val1, val2)
 
-    for match in AREA_PATTERN.finditer(text):
-        label = _sanitize_label(match.group("label"))
-        area = _to_float(match.group("area"))
+    for token in scanner.leading(_AREA_NUMBER):
+        label = _sanitize_label(token.label)
+        area = _to_float(token.number)
         add_measurement(label, area, None, None)
 
-    for match in AREA_TRAILING_PATTERN.finditer(text):
-        label = _sanitize_label(match.group("label"))
-        area = _to_float(match.group("area"))
+    for token in scanner.trailing(_AREA_TRAILING_NUMBER):
+        label = _sanitize_label(token.label)
+        area = _to_float(token.number)
         add_measurement(label, area, None, None)
 
-    for match in LENGTH_PATTERN.finditer(text):
-        label = _sanitize_label(match.group("label"))
-        length = _to_meters(match.group("length"), match.group("unit"))
+    for token in scanner.leading(_LENGTH_NUMBER):
+        label = _sanitize_label(token.label)
+        length = _to_meters(token.number, token.match.group("unit"))
         add_measurement(label, None, length, None)
 
-    for match in LENGTH_TRAILING_PATTERN.finditer(text):
-        label = _sanitize_label(match.group("label"))
-        length = _to_meters(match.group("length"), match.group("unit"))
+    for token in scanner.trailing(_LENGTH_TRAILING_NUMBER):
+        label = _sanitize_label(token.label)
+        length = _to_meters(token.number, token.match.group("unit"))
         add_measurement(label, None, length, None)
 
     return measurements
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from typing import List, Optional, Set
+
+from .dimension_parser import (
+    AREA_PATTERN,
+    AREA_TRAILING_PATTERN,
+    LENGTH_PATTERN,
+    LENGTH_TRAILING_PATTERN,
+    LxW_PATTERN,
+    _sanitize_label,
+    _to_float,
+    _to_meters,
+)
+from .models import PlanMeasurement
+
+
+def parse_measurements_reference(
+    text: str, *, page: Optional[int] = None, seen_tokens: Optional[Set[str]] = None
+) -> List[PlanMeasurement]:
+    """Previous regex implementation of ``parse_measurements_from_text``.
+
+    Runs the grammar patterns directly with ``finditer``. It is quadratic on
+    long label-like runs and only kept as the reference the linear scanner is
+    checked against (see ``dimension_parser_check.py``).
+    """
+    measurements: List[PlanMeasurement] = []
+    if seen_tokens is None:
+        seen_tokens = set()
+
+    def add_measurement(label: str, area: Optional[float], length: Optional[float], width: Optional[float]) -> None:
+        token = f"{label}|{area}|{length}|{width}"
+        if token in seen_tokens:
+            return
+        seen_tokens.add(token)
+        measurements.append(
+            PlanMeasurement(
+                label=label.title() if label else "Zone",
+                area_m2=area,
+                length_m=length,
+                width_m=width,
+                source="text",
+                page=page,
+            )
+        )
+
+    for match in LxW_PATTERN.finditer(text):
+        label = _sanitize_label(match.group("label"))
+        val1 = _to_meters(match.group("val1"), match.group("unit1"))
+        val2 = _to_meters(match.group("val2"), match.group("unit2"))
+        area = val1 * val2
+        add_measurement(label, area, val1, val2)
+
+    for match in AREA_PATTERN.finditer(text):
+        label = _sanitize_label(match.group("label"))
+        area = _to_float(match.group("area"))
+        add_measurement(label, area, None, None)
+
+    for match in AREA_TRAILING_PATTERN.finditer(text):
+        label = _sanitize_label(match.group("label"))
+        area = _to_float(match.group("area"))
+        add_measurement(label, area, None, None)
+
+    for match in LENGTH_PATTERN.finditer(text):
+        label = _sanitize_label(match.group("label"))
+        length = _to_meters(match.group("length"), match.group("unit"))
+        add_measurement(label, None, length, None)
+
+    for match in LENGTH_TRAILING_PATTERN.finditer(text):
+        label = _sanitize_label(match.group("label"))
+        length = _to_meters(match.group("length"), match.group("unit"))
+        add_measurement(label, None, length, None)
+
+    return measurements
@@ -12,6 +12,15 @@ class PlanMeasurement:
     length_m: Optional[float] = None
     width_m: Optional[float] = None
     source: str = "text"
+    page: Optional[int] = None
+
+
+@dataclass
+class PlanPage:
+    page: int
+    measurements: List[PlanMeasurement] = field(default_factory=list)
+    engine: Optional[str] = None
+    text: Optional[str] = None
 
 
 @dataclass
@@ -19,3 +28,5 @@ class PlanAnalysis:
     source: Path
     measurements: List[PlanMeasurement] = field(default_factory=list)
     raw_text: str = ""
+    page_count: int = 0
+    text_engine: Optional[str] = None
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import pytesseract
+    from pytesseract import TesseractNotFoundError
+except ImportError:  # pragma: no cover - optional dependency
+    pytesseract = None
+    TesseractNotFoundError = None
+
+try:
+    import tesserocr  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    tesserocr = None
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None  # type: ignore
+
+from shared.utils import require_dependency
+
+TESSERACT_MISSING = (
+    "Tesseract OCR n'est pas installé ou introuvable dans le PATH. "
+    "Installez-le (macOS: brew install tesseract, Linux: sudo apt install tesseract-ocr)."
+)
+
+
+@dataclass(frozen=True)
+class OcrCapabilities:
+    available: bool
+    version: Optional[str] = None
+    languages: Tuple[str, ...] = ()
+    persistent_engine: bool = False
+    error: Optional[str] = None
+
+    def pick_language(self) -> str:
+        """Use French OCR if available, otherwise fallback to English."""
+        languages = self.languages or ("eng",)
+        if "fra" in languages:
+            return "fra"
+        if "eng" in languages:
+            return "eng"
+        raise RuntimeError(
+            "Aucun pack de langue Tesseract disponible. "
+            "Installez au moins 'tesseract-lang' (fra) ou gardez 'eng'."
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "available": self.available,
+            "version": self.version,
+            "languages": list(self.languages),
+            "persistent_engine": self.persistent_engine,
+            "error": self.error,
+        }
+
+
+_probe_lock = threading.Lock()
+_capabilities: Optional[OcrCapabilities] = None
+
+
+def get_ocr_capabilities(*, refresh: bool = False) -> OcrCapabilities:
+    """Probe Tesseract once per process; later calls reuse the result."""
+    global _capabilities
+    with _probe_lock:
+        if _capabilities is None or refresh:
+            _capabilities = _probe()
+        return _capabilities
+
+
+def require_ocr() -> OcrCapabilities:
+    capabilities = get_ocr_capabilities()
+    if not capabilities.available:
+        raise RuntimeError(TESSERACT_MISSING)
+    return capabilities
+
+
+def _probe() -> OcrCapabilities:
+    if pytesseract is None:
+        if tesserocr is not None:
+            return _probe_tesserocr()
+        return OcrCapabilities(available=False, error="pytesseract non installé")
+    try:
+        version = str(pytesseract.get_tesseract_version())
+    except (TesseractNotFoundError, OSError) as exc:  # type: ignore[misc]
+        return OcrCapabilities(available=False, error=str(exc) or TESSERACT_MISSING)
+    try:
+        languages = tuple(pytesseract.get_languages(config=""))
+    except Exception:
+        languages = ()
+    return OcrCapabilities(
+        available=True,
+        version=version,
+        languages=languages,
+        persistent_engine=tesserocr is not None,
+    )
+
+
+def _probe_tesserocr() -> OcrCapabilities:
+    """Probe through tesserocr when pytesseract is not installed."""
+    assert tesserocr is not None
+    try:
+        # "tesseract 5.3.0\n leptonica-1.82.0\n ..."
+        version = tesserocr.tesseract_version().split("\n")[0].replace("tesseract", "").strip()
+        _, languages = tesserocr.get_languages()
+    except Exception as exc:
+        return OcrCapabilities(available=False, error=str(exc) or TESSERACT_MISSING)
+    return OcrCapabilities(
+        available=True,
+        version=version or None,
+        languages=tuple(languages),
+        persistent_engine=True,
+    )
+
+
+class OcrEngine(ABC):
+    """Turns a binarized image (NumPy array) into text.
+
+    Use it as a context manager (or call :meth:`close`) to release what it
+    keeps loaded between images.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def image_to_string(self, image: Any, *, lang: str) -> str:
+        ...
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "OcrEngine":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class SubprocessOcrEngine(OcrEngine):
+    """pytesseract: one ``tesseract`` process per image."""
+
+    name = "subprocess"
+
+    def __init__(self) -> None:
+        require_dependency(pytesseract, "pytesseract")
+
+    def image_to_string(self, image: Any, *, lang: str) -> str:
+        return pytesseract.image_to_string(image, lang=lang)
+
+
+class PersistentOcrEngine(OcrEngine):
+    """tesserocr: the Tesseract API stays loaded between images of a batch.
+
+    One API handle is created per language on first use and ended by
+    :meth:`close`. An engine must not be shared between threads.
+    """
+
+    name = "persistent"
+
+    def __init__(self) -> None:
+        require_dependency(tesserocr, "tesserocr")
+        require_dependency(Image, "Pillow")
+        self._apis: Dict[str, Any] = {}
+
+    def image_to_string(self, image: Any, *, lang: str) -> str:
+        api = self._apis.get(lang)
+        if api is None:
+            api = self._apis[lang] = tesserocr.PyTessBaseAPI(lang=lang)
+        api.SetImage(Image.fromarray(image))
+        return api.GetUTF8Text()
+
+    def close(self) -> None:
+        apis, self._apis = self._apis, {}
+        for api in apis.values():
+            api.End()
+
+
+def resolve_ocr_mode(mode: str) -> str:
+    """"subprocess" or "persistent" for ``mode`` ("auto" picks tesserocr if installed)."""
+    if mode == "auto":
+        mode = "persistent" if tesserocr is not None else "subprocess"
+    if mode not in ("subprocess", "persistent"):
+        raise ValueError(f"Mode OCR inconnu: {mode!r}")
+    return mode
+
+
+def ocr_engine_available(mode: str) -> bool:
+    """Whether the package ``mode`` needs is installed (not Tesseract itself)."""
+    if resolve_ocr_mode(mode) == "persistent":
+        return tesserocr is not None and Image is not None
+    return pytesseract is not None
+
+
+def open_ocr_engine(mode: str = "subprocess") -> OcrEngine:
+    """A new engine for ``mode``: "subprocess", "persistent" or "auto".
+
+    Only the package of the chosen mode is required. Close the engine when
+    done, ideally with ``with``.
+    """
+    if resolve_ocr_mode(mode) == "persistent":
+        return PersistentOcrEngine()
+    return SubprocessOcrEngine()
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Sequence
+
+try:
+    import pdfplumber
+except ImportError:  # pragma: no cover - optional dependency
+    pdfplumber = None
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # pragma: no cover - optional dependency
+    pdfium = None
+
+from shared.utils import require_dependency
+
+
+class PdfTextEngine(ABC):
+    """Extracts the text layer of a PDF, page by page."""
+
+    name = ""
+    package = ""
+
+    @abstractmethod
+    def is_available(self) -> bool:
+        ...
+
+    @abstractmethod
+    def page_count(self, path: str) -> int:
+        ...
+
+    @abstractmethod
+    def iter_extract(
+        self, path: str, pages: Sequence[int], *, layout: bool = False
+    ) -> Iterator[str]:
+        """Yield the text of ``pages`` (0-based indices) in the given order.
+
+        The document stays open until the iterator is exhausted or closed.
+        """
+
+    def extract(
+        self, path: str, pages: Sequence[int], *, layout: bool = False
+    ) -> List[str]:
+        """Return the text of ``pages`` (0-based indices), in the given order."""
+        return list(self.iter_extract(path, pages, layout=layout))
+
+
+class PdfplumberEngine(PdfTextEngine):
+    """Full pdfminer layout analysis: slow, but honours ``layout=True``."""
+
+    name = "pdfplumber"
+    package = "pdfplumber"
+
+    def is_available(self) -> bool:
+        return pdfplumber is not None
+
+    def page_count(self, path: str) -> int:
+        require_dependency(pdfplumber, self.package)
+        with pdfplumber.open(path) as pdf:
+            return len(pdf.pages)
+
+    def iter_extract(
+        self, path: str, pages: Sequence[int], *, layout: bool = False
+    ) -> Iterator[str]:
+        require_dependency(pdfplumber, self.package)
+        with pdfplumber.open(path) as pdf:
+            for index in pages:
+                yield pdf.pages[index].extract_text(layout=layout) or ""
+
+
+class PdfiumEngine(PdfTextEngine):
+    """Raw text layer through PDFium, without building character objects."""
+
+    name = "pdfium"
+    package = "pypdfium2"
+
+    def is_available(self) -> bool:
+        return pdfium is not None
+
+    def page_count(self, path: str) -> int:
+        require_dependency(pdfium, self.package)
+        document = pdfium.PdfDocument(path)
+        try:
+            return len(document)
+        finally:
+            document.close()
+
+    def iter_extract(
+        self, path: str, pages: Sequence[int], *, layout: bool = False
+    ) -> Iterator[str]:
+        require_dependency(pdfium, self.package)
+        document = pdfium.PdfDocument(path)
+        try:
+            for index in pages:
+                page = document[index]
+                textpage = page.get_textpage()
+                try:
+                    text = textpage.get_text_range().replace("\r\n", "\n")
+                finally:
+                    textpage.close()
+                    page.close()
+                yield text
+        finally:
+            document.close()
+
+
+ENGINES: Dict[str, PdfTextEngine] = {
+    engine.name: engine for engine in (PdfiumEngine(), PdfplumberEngine())
+}
+
+
+def get_engine(name: str) -> PdfTextEngine:
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ValueError(
+            f"Moteur PDF inconnu: {name!r} (disponibles: {', '.join(ENGINES)})"
+        ) from None
+
+
+def iter_page_images(path: str, pages: Sequence[int], *, dpi: int) -> Iterator[Any]:
+    """Rasterize ``pages`` to grayscale PIL images at ``dpi``."""
+    if pdfium is not None:
+        document = pdfium.PdfDocument(path)
+        try:
+            for index in pages:
+                page = document[index]
+                try:
+                    bitmap = page.render(scale=dpi / 72)
+                    yield bitmap.to_pil().convert("L")
+                finally:
+                    page.close()
+        finally:
+            document.close()
+        return
+
+    require_dependency(pdfplumber, "pdfplumber")
+    with pdfplumber.open(path) as pdf:
+        for index in pages:
+            yield pdf.pages[index].to_image(resolution=dpi).original.convert("L")
+
+
+def is_usable_text(text: str) -> bool:
+    """Whether an engine output is worth keeping (not blank, not mostly garbage)."""
+    stripped = text.strip()
+    if not stripped:
+        return False
+    return stripped.count("�") / len(stripped) < 0.1
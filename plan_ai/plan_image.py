@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Tuple
+
+try:
+    import cv2  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    cv2 = None  # type: ignore
+
+from shared.utils import require_dependency
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg"}
+
+
+class PlanImage:
+    """A raster plan decoded once and shared by OCR and contour detection.
+
+    Only the grayscale frame is kept: every stage works on that one NumPy
+    array, shared rather than copied, so callers must treat it as read-only.
+    The blurred variants are computed on each call and not kept, since each
+    stage needs one of them once and holding them would raise peak memory.
+    """
+
+    def __init__(self, path: Path, bgr: Any) -> None:
+        self.path = path
+        self.gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "PlanImage":
+        require_dependency(cv2, "opencv-python")
+        file_path = Path(path)
+        frame = cv2.imread(str(file_path), cv2.IMREAD_COLOR)
+        if frame is None:
+            raise RuntimeError(f"Impossible de lire l'image: {file_path}")
+        return cls(file_path, frame)
+
+    @staticmethod
+    def is_image(path: str | Path) -> bool:
+        return Path(path).suffix.lower() in IMAGE_SUFFIXES
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """(height, width) in pixels."""
+        return self.gray.shape[0], self.gray.shape[1]
+
+    def gaussian(self) -> Any:
+        """Light Gaussian blur used before OCR binarization."""
+        return cv2.GaussianBlur(self.gray, (5, 5), sigmaX=0)
+
+    def bilateral(self) -> Any:
+        """Edge-preserving blur used before contour detection."""
+        return cv2.bilateralFilter(self.gray, d=9, sigmaColor=75, sigmaSpace=75)
@@ -1,13 +1,10 @@
 from __future__ import annotations
 
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List
-
-try:
-    import pdfplumber
-except ImportError:  # pragma: no cover - optional dependency
-    pdfplumber = None
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 try:
     import cv2  # type: ignore
@@ -16,86 +13,390 @@ except ImportError:  # pragma: no cover - optional dependency
     cv2 = None  # type: ignore
     np = None  # type: ignore
 
-try:
-    import pytesseract
-    from pytesseract import TesseractNotFoundError
-except ImportError:  # pragma: no cover - optional dependency
-    pytesseract = None
-    TesseractNotFoundError = None
-
 from shared.utils import log_info, require_dependency
 from .dimension_parser import parse_measurements_from_text
-from .models import PlanAnalysis, PlanMeasurement
+from .models import PlanAnalysis, PlanMeasurement, PlanPage
+from .ocr import (
+    OcrEngine,
+    get_ocr_capabilities,
+    ocr_engine_available,
+    open_ocr_engine,
+    require_ocr,
+)
+from .plan_image import PlanImage
+from .pdf_engines import (
+    ENGINES,
+    PdfTextEngine,
+    get_engine,
+    is_usable_text,
+    iter_page_images,
+)
+
+# Pages handed to the process pool per round when a PDF is read in parallel.
+PAGE_WINDOW = 16
 
 
 class PlanReader:
-    """Best-effort OCR/PDF extraction to capture measurements from plans."""
+    """Best-effort OCR/PDF extraction to capture measurements from plans.
+
+    ``pdf_engine`` selects how PDF text layers are read: ``"pdfium"`` (fast raw
+    text), ``"pdfplumber"`` (full layout analysis) or ``"auto"`` (pdfium, then
+    pdfplumber for the pages it could not read). ``ocr_engine`` is
+    ``"subprocess"`` (pytesseract), ``"persistent"`` (tesserocr, the model stays
+    loaded between pages) or ``"auto"``.
+    """
 
-    def __init__(self, *, dpi: int = 300) -> None:
+    def __init__(
+        self,
+        *,
+        dpi: int = 300,
+        lang: Optional[str] = None,
+        workers: int = 1,
+        pdf_engine: str = "auto",
+        ocr_fallback: bool = True,
+        ocr_engine: str = "subprocess",
+    ) -> None:
+        if pdf_engine != "auto":
+            get_engine(pdf_engine)
         self._dpi = dpi
+        self._lang = lang
+        self._workers = max(1, workers)
+        self._pdf_engine = pdf_engine
+        self._ocr_fallback = ocr_fallback
+        self._ocr_engine = ocr_engine
+
+    @property
+    def settings(self) -> Dict[str, Any]:
+        """Options that change the extracted text (used for result caching)."""
+        return {
+            "dpi": self._dpi,
+            "lang": self._lang or "auto",
+            "pdf_engine": self._pdf_engine,
+            "ocr_fallback": self._ocr_fallback,
+            "ocr_engine": self._ocr_engine,
+        }
+
+    def read(
+        self,
+        path: str | Path,
+        *,
+        engine: Optional[str] = None,
+        layout: bool = False,
+        image: Optional[PlanImage] = None,
+        keep_text: bool = True,
+    ) -> PlanAnalysis:
+        """Extract and parse a plan.
+
+        ``engine`` overrides the PDF engine for this call; ``layout=True``
+        forces pdfplumber's layout-preserving extraction. For raster plans an
+        already decoded ``image`` is reused instead of reading the file again.
+        With ``keep_text=False`` the page texts are dropped once parsed and
+        ``raw_text`` stays empty.
+        """
+        file_path = Path(path)
+        return collect_analysis(
+            file_path,
+            self.iter_pages(
+                file_path, engine=engine, layout=layout, image=image, keep_text=keep_text
+            ),
+        )
+
+    def iter_pages(
+        self,
+        path: str | Path,
+        *,
+        engine: Optional[str] = None,
+        layout: bool = False,
+        image: Optional[PlanImage] = None,
+        keep_text: bool = False,
+    ) -> Iterator[PlanPage]:
+        """Extract and parse a plan page by page.
 
-    def read(self, path: str | Path) -> PlanAnalysis:
+        Each page is parsed as soon as its text is available, so the first
+        results of a long document arrive before the last pages are read.
+        Measurements carry their 1-based page number; one already found on an
+        earlier page is not repeated. ``PlanPage.engine`` lists the engines a
+        page went through (e.g. ``"pdfium+pdfplumber+ocr"``).
+        """
         file_path = Path(path)
         if not file_path.exists():
             raise FileNotFoundError(file_path)
 
         log_info(f"Lecture du plan: {file_path}")
-        raw_text = self._extract_text(file_path)
-        measurements = parse_measurements_from_text(raw_text)
-        return PlanAnalysis(source=file_path, measurements=measurements, raw_text=raw_text)
+        seen_tokens: Set[str] = set()
+        for index, text, text_engine in self._iter_page_texts(
+            file_path, engine=engine or self._pdf_engine, layout=layout, image=image
+        ):
+            yield PlanPage(
+                page=index + 1,
+                measurements=parse_measurements_from_text(
+                    text, page=index + 1, seen_tokens=seen_tokens
+                ),
+                engine=text_engine,
+                text=text if keep_text else None,
+            )
+
+    def iter_measurements(self, path: str | Path, **options: Any) -> Iterator[PlanMeasurement]:
+        """Measurements of ``path`` as each page is parsed (see ``iter_pages``)."""
+        for page in self.iter_pages(path, **options):
+            yield from page.measurements
 
-    def _extract_text(self, file_path: Path) -> str:
+    def _iter_page_texts(
+        self,
+        file_path: Path,
+        *,
+        engine: str,
+        layout: bool,
+        image: Optional[PlanImage] = None,
+    ) -> Iterator[Tuple[int, str, str]]:
         suffix = file_path.suffix.lower()
         if suffix == ".pdf":
-            require_dependency(pdfplumber, "pdfplumber")
-            return self._extract_pdf_text(file_path)
+            yield from self._iter_pdf_pages(file_path, engine=engine, layout=layout)
         else:
             require_dependency(cv2, "opencv-python")
-            require_dependency(pytesseract, "pytesseract")
-            return self._extract_image_text(file_path)
-
-    def _extract_pdf_text(self, file_path: Path) -> str:
-        text_chunks: List[str] = []
-        assert pdfplumber is not None
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                text_chunks.append(page.extract_text() or "")
-        return "\n".join(text_chunks)
-
-    def _extract_image_text(self, file_path: Path) -> str:
-        assert cv2 is not None and pytesseract is not None
+            image = image or PlanImage.load(file_path)
+            yield 0, self._extract_image_text(image), "tesseract"
+
+    def _iter_pdf_pages(
+        self, file_path: Path, *, engine: str, layout: bool
+    ) -> Iterator[Tuple[int, str, str]]:
+        primary = self._resolve_pdf_engine(engine, layout=layout)
+        fallback = ENGINES["pdfplumber"]
+        use_fallback = engine == "auto" and primary is not fallback and fallback.is_available()
+        started = time.perf_counter()
+        page_count = primary.page_count(str(file_path))
+        used: List[str] = []
+        ocr_missing: Optional[str] = None
+        ocr: Optional[OcrEngine] = None
+        skipped = 0
+
+        pool = (
+            ProcessPoolExecutor(max_workers=self._workers)
+            if self._workers > 1 and page_count > 1
+            else None
+        )
         try:
-            pytesseract.get_tesseract_version()
-        except (TesseractNotFoundError, OSError) as exc:  # type: ignore[arg-type]
-            raise RuntimeError(
-                "Tesseract OCR n'est pas installé ou introuvable dans le PATH. "
-                "Installez-le (macOS: brew install tesseract, Linux: sudo apt install tesseract-ocr)."
-            ) from exc
-        image = cv2.imread(str(file_path))
-        if image is None:
-            raise RuntimeError(f"Impossible de lire l'image: {file_path}")
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        blurred = cv2.GaussianBlur(gray, (5, 5), sigmaX=0)
-        _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        target_lang = self._pick_language()
-        text = pytesseract.image_to_string(thresh, lang=target_lang)
-        return text
+            for indices, texts in self._iter_primary_texts(
+                primary, file_path, page_count, layout, pool
+            ):
+                engines = [primary.name] * len(indices)
+
+                if use_fallback:
+                    retry = [i for i, text in enumerate(texts) if not is_usable_text(text)]
+                    if retry:
+                        pages = [indices[i] for i in retry]
+                        for i, text in zip(
+                            retry, self._run_pdf_engine(fallback, file_path, pages, layout, pool)
+                        ):
+                            texts[i] = text
+                            engines[i] = f"{engines[i]}+{fallback.name}"
+
+                if self._ocr_fallback:
+                    # Scanned pages have no text layer: rasterize and OCR only those.
+                    missing = [i for i, text in enumerate(texts) if not is_usable_text(text)]
+                    if missing and ocr_missing is None:
+                        ocr_missing = self._ocr_missing_reason() or ""
+                    if missing and not ocr_missing:
+                        # Pages OCRed in this process share one engine for the document.
+                        ocr = ocr or open_ocr_engine(self._ocr_engine)
+                        pages = [indices[i] for i in missing]
+                        texts_ocr = self._ocr_pdf_pages(file_path, pages, pool, ocr)
+                        for i, text in zip(missing, texts_ocr):
+                            texts[i] = text
+                            engines[i] = f"{engines[i]}+ocr"
+                    elif missing:
+                        skipped += len(missing)
+
+                for chain in dict.fromkeys(engines):
+                    used.extend(name for name in chain.split("+") if name not in used)
+                yield from zip(indices, texts, engines)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            if ocr is not None:
+                ocr.close()
+
+        if skipped:
+            log_info(f"{ocr_missing}: {skipped} page(s) sans texte ignorée(s).")
+        elapsed = time.perf_counter() - started
+        log_info(
+            f"Extraction PDF ({'+'.join(used) or primary.name}): {page_count} page(s) "
+            f"en {elapsed:.2f} s ({min(self._workers, max(page_count, 1))} worker(s))"
+        )
 
     @staticmethod
-    def _pick_language() -> str:
-        """Use French OCR if available, otherwise fallback to English."""
-        try:
-            languages = pytesseract.get_languages(config="")  # type: ignore[attr-defined]
-        except Exception:
-            languages = ["eng"]
-        if "fra" in languages:
-            return "fra"
-        if "eng" in languages:
-            return "eng"
-        raise RuntimeError(
-            "Aucun pack de langue Tesseract disponible. "
-            "Installez au moins 'tesseract-lang' (fra) ou gardez 'eng'."
+    def _resolve_pdf_engine(engine: str, *, layout: bool) -> PdfTextEngine:
+        if layout:
+            engine = "pdfplumber"
+        if engine == "auto":
+            fast = ENGINES["pdfium"]
+            engine = fast.name if fast.is_available() else "pdfplumber"
+        return get_engine(engine)
+
+    def _iter_primary_texts(
+        self,
+        engine: PdfTextEngine,
+        file_path: Path,
+        page_count: int,
+        layout: bool,
+        pool: Optional[ProcessPoolExecutor],
+    ) -> Iterator[Tuple[List[int], List[str]]]:
+        """Text of every page as ``(indices, texts)`` batches, in page order."""
+        if pool is None:
+            # One page at a time from a document kept open: each page can be
+            # streamed as soon as it is read.
+            pages = engine.iter_extract(str(file_path), range(page_count), layout=layout)
+            for index, text in enumerate(pages):
+                yield [index], [text]
+            return
+
+        # The pool works window by window, so a window is yielded while the
+        # next one is not read yet.
+        window = max(PAGE_WINDOW, self._workers * 4)
+        for first in range(0, page_count, window):
+            indices = list(range(first, min(first + window, page_count)))
+            yield indices, self._run_pdf_engine(engine, file_path, indices, layout, pool)
+
+    def _run_pdf_engine(
+        self,
+        engine: PdfTextEngine,
+        file_path: Path,
+        pages: List[int],
+        layout: bool,
+        pool: Optional[ProcessPoolExecutor],
+    ) -> List[str]:
+        if pool is None or len(pages) <= 1:
+            return engine.extract(str(file_path), pages, layout=layout)
+
+        # A couple of chunks per worker keeps the pool busy when some pages
+        # are much denser than others.
+        chunks = _split_pages(pages, self._workers * 2)
+        results = pool.map(
+            _extract_pdf_chunk,
+            [engine.name] * len(chunks),
+            [str(file_path)] * len(chunks),
+            chunks,
+            [layout] * len(chunks),
+        )
+        return [text for chunk in results for text in chunk]
+
+    def _ocr_missing_reason(self) -> Optional[str]:
+        if cv2 is None or not ocr_engine_available(self._ocr_engine):
+            return "OCR indisponible"
+        if not get_ocr_capabilities().available:
+            return "Tesseract introuvable"
+        return None
+
+    def _ocr_pdf_pages(
+        self,
+        file_path: Path,
+        pages: List[int],
+        pool: Optional[ProcessPoolExecutor],
+        engine: OcrEngine,
+    ) -> List[str]:
+        """OCR of ``pages``: in the pool (one engine per chunk) or with ``engine``."""
+        lang = self._lang or get_ocr_capabilities().pick_language()
+        started = time.perf_counter()
+        if pool is None or len(pages) <= 1:
+            texts = _ocr_pdf_images(str(file_path), pages, self._dpi, lang, engine)
+        else:
+            chunks = _split_pages(pages, self._workers * 2)
+            results = pool.map(
+                _ocr_pdf_chunk,
+                [str(file_path)] * len(chunks),
+                chunks,
+                [self._dpi] * len(chunks),
+                [lang] * len(chunks),
+                [self._ocr_engine] * len(chunks),
+            )
+            texts = [text for chunk in results for text in chunk]
+        log_info(
+            f"OCR PDF: {len(pages)} page(s) scannée(s) en "
+            f"{time.perf_counter() - started:.2f} s"
         )
+        return texts
+
+    def _extract_image_text(self, image: PlanImage) -> str:
+        capabilities = require_ocr()
+        with open_ocr_engine(self._ocr_engine) as engine:
+            return _ocr_blurred(
+                image.gaussian(), self._lang or capabilities.pick_language(), engine
+            )
 
     def _parse_measurements(self, text: str) -> List[PlanMeasurement]:
         return parse_measurements_from_text(text)
+
+
+def collect_analysis(source: Path, pages: Iterable[PlanPage]) -> PlanAnalysis:
+    """Assemble a PlanAnalysis from the pages of ``PlanReader.iter_pages``."""
+    measurements: List[PlanMeasurement] = []
+    texts: List[str] = []
+    engines: List[str] = []
+    page_count = 0
+    for page in pages:
+        page_count += 1
+        measurements.extend(page.measurements)
+        if page.text is not None:
+            texts.append(page.text)
+        for name in (page.engine or "").split("+"):
+            if name and name not in engines:
+                engines.append(name)
+    return PlanAnalysis(
+        source=source,
+        measurements=measurements,
+        raw_text="\n".join(texts),
+        page_count=page_count,
+        text_engine="+".join(engines) or None,
+    )
+
+
+def _split_pages(pages: List[int], parts: int) -> List[List[int]]:
+    """Split ``pages`` into at most ``parts`` contiguous, order-preserving chunks."""
+    parts = max(1, min(parts, len(pages)))
+    size, extra = divmod(len(pages), parts)
+    chunks: List[List[int]] = []
+    start = 0
+    for index in range(parts):
+        stop = start + size + (1 if index < extra else 0)
+        chunks.append(pages[start:stop])
+        start = stop
+    return chunks
+
+
+def _extract_pdf_chunk(
+    engine_name: str, path: str, pages: List[int], layout: bool
+) -> List[str]:
+    """Process-pool worker: text of ``pages``, in the given order."""
+    return get_engine(engine_name).extract(path, pages, layout=layout)
+
+
+def _ocr_gray(gray: Any, lang: str, engine: OcrEngine) -> str:
+    """Blur + Otsu binarization, then Tesseract, on a grayscale image."""
+    assert cv2 is not None
+    return _ocr_blurred(cv2.GaussianBlur(gray, (5, 5), sigmaX=0), lang, engine)
+
+
+def _ocr_blurred(blurred: Any, lang: str, engine: OcrEngine) -> str:
+    """Otsu binarization, then Tesseract, on an already blurred grayscale image."""
+    assert cv2 is not None
+    _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return engine.image_to_string(thresh, lang=lang)
+
+
+def _ocr_pdf_images(
+    path: str, pages: List[int], dpi: int, lang: str, engine: OcrEngine
+) -> List[str]:
+    """Rasterize ``pages`` at ``dpi`` and OCR them with ``engine``."""
+    assert np is not None
+    return [
+        _ocr_gray(np.asarray(image), lang, engine)
+        for image in iter_page_images(path, pages, dpi=dpi)
+    ]
+
+
+def _ocr_pdf_chunk(
+    path: str, pages: List[int], dpi: int, lang: str, ocr_mode: str
+) -> List[str]:
+    """Process-pool worker: rasterize ``pages`` at ``dpi`` and OCR them."""
+    with open_ocr_engine(ocr_mode) as engine:
+        return _ocr_pdf_images(path, pages, dpi, lang, engine)
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import List, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 try:
     import cv2  # type: ignore
@@ -11,7 +13,17 @@ except ImportError:  # pragma: no cover
     cv2 = None  # type: ignore
     np = None  # type: ignore
 
-from shared.utils import require_dependency
+from shared.utils import log_info, require_dependency
+from .plan_image import PlanImage
+
+# The bilateral filter (d=9) reads 4 pixels around each pixel; tiles overlap
+# by more than that so the stitched filter output matches a single pass.
+# Canny's hysteresis is not local, so it always runs on the stitched image.
+TILE_OVERLAP_PX = 16
+# Margin (in pyramid pixels) added around a candidate before refining it.
+REFINE_MARGIN_PX = 8
+
+Box = Tuple[int, int, int, int]
 
 
 @dataclass
@@ -21,27 +33,195 @@ class RoomDetection:
 
 
 class RoomDetector:
-    def __init__(self, *, min_area_px: int = 5_000) -> None:
+    """Find large closed contours (rooms, zones) in a raster plan.
+
+    With ``max_side_px`` set, images larger than that are first analysed on a
+    downscaled pyramid level; each candidate is then refined at full
+    resolution on its own region, unless it covers more than
+    ``refine_max_px`` pixels (its rescaled pyramid contour is kept as is).
+    With ``workers > 1`` the bilateral filter runs on overlapping tiles of
+    ``tile_px`` in a thread pool (OpenCV releases the GIL). Areas and bounding
+    boxes are always expressed in original image pixels.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_area_px: int = 5_000,
+        max_side_px: Optional[int] = None,
+        workers: int = 1,
+        tile_px: int = 2048,
+        refine_max_px: int = 16_000_000,
+    ) -> None:
         self.min_area_px = min_area_px
+        self.max_side_px = max_side_px
+        self.workers = max(1, workers)
+        self.tile_px = max(4 * TILE_OVERLAP_PX, tile_px)
+        self.refine_max_px = refine_max_px
 
-    def detect(self, path: Path) -> List[RoomDetection]:
+    @property
+    def settings(self) -> Dict[str, Any]:
+        """Options that change the detections (used for result caching).
+
+        ``workers`` and ``tile_px`` are left out: tiling gives the same edges.
+        """
+        return {
+            "min_area_px": self.min_area_px,
+            "max_side_px": self.max_side_px or 0,
+            "refine_max_px": self.refine_max_px,
+        }
+
+    def detect(self, source: Path | PlanImage) -> List[RoomDetection]:
         require_dependency(cv2, "opencv-python")
-        frame = cv2.imread(str(path))
-        if frame is None:
-            return []
+        if isinstance(source, PlanImage):
+            image = source
+        else:
+            try:
+                image = PlanImage.load(source)
+            except RuntimeError:
+                return []
+
+        height, width = image.shape
+        if self.max_side_px and max(height, width) > self.max_side_px:
+            return self._detect_multiscale(image)
+
+        if self.workers > 1 and max(height, width) > self.tile_px:
+            edges = self._edge_map(image.gray)
+        else:
+            edges = _edges_from_blurred(image.bilateral())
+        return [
+            RoomDetection(area_px=area, bounding_box=box)
+            for area, box in _contours(edges, self.min_area_px)
+        ]
 
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        blurred = cv2.bilateralFilter(gray, d=9, sigmaColor=75, sigmaSpace=75)
-        edges = cv2.Canny(blurred, threshold1=50, threshold2=150)
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
-        dilated = cv2.dilate(edges, kernel, iterations=2)
-        contours, _ = cv2.findContours(dilated, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    def _detect_multiscale(self, image: PlanImage) -> List[RoomDetection]:
+        height, width = image.shape
+        factor = self.max_side_px / max(height, width)
+        small = cv2.resize(
+            image.gray,
+            (max(1, round(width * factor)), max(1, round(height * factor))),
+            interpolation=cv2.INTER_AREA,
+        )
+        candidates = _contours(self._edge_map(small), self.min_area_px * factor * factor)
 
+        regions: List[Box] = []
         detections: List[RoomDetection] = []
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if area < self.min_area_px:
-                continue
-            x, y, w, h = cv2.boundingRect(contour)
-            detections.append(RoomDetection(area_px=float(area), bounding_box=(x, y, w, h)))
+        for area, box in candidates:
+            full_box = _scale_box(box, 1 / factor, (height, width))
+            if full_box[2] * full_box[3] > self.refine_max_px:
+                detections.append(
+                    RoomDetection(area_px=area / (factor * factor), bounding_box=full_box)
+                )
+            else:
+                regions.append(box)
+
+        refine = partial(self._refine, image.gray, factor=factor)
+        if self.workers > 1 and len(regions) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                refined = list(pool.map(refine, regions))
+        else:
+            refined = [refine(box) for box in regions]
+
+        seen = {detection.bounding_box for detection in detections}
+        for found in refined:
+            for detection in found:
+                if detection.bounding_box not in seen:
+                    seen.add(detection.bounding_box)
+                    detections.append(detection)
+        log_info(
+            f"Détection multi-échelle: {len(candidates)} candidat(s) à {factor:.2f}x, "
+            f"{len(regions)} affiné(s) en pleine résolution"
+        )
         return detections
+
+    def _refine(self, gray: Any, box: Box, factor: float) -> List[RoomDetection]:
+        """Redetect a pyramid candidate on its full-resolution region."""
+        height, width = gray.shape[:2]
+        x, y, w, h = box
+        margin = REFINE_MARGIN_PX
+        left, top, right, bottom = _scale_box(
+            (x - margin, y - margin, w + 2 * margin, h + 2 * margin),
+            1 / factor,
+            (height, width),
+            as_corners=True,
+        )
+        cx0, cy0, cx1, cy1 = x / factor, y / factor, (x + w) / factor, (y + h) / factor
+        detections: List[RoomDetection] = []
+        for area, (rx, ry, rw, rh) in _contours(
+            self._edge_map(gray[top:bottom, left:right]), self.min_area_px
+        ):
+            full_box = (rx + left, ry + top, rw, rh)
+            # Contours caught in the margin belong to a neighbouring candidate.
+            centre_x, centre_y = full_box[0] + rw / 2, full_box[1] + rh / 2
+            if cx0 <= centre_x <= cx1 and cy0 <= centre_y <= cy1:
+                detections.append(RoomDetection(area_px=area, bounding_box=full_box))
+        return detections
+
+    def _edge_map(self, gray: Any) -> Any:
+        height, width = gray.shape[:2]
+        if self.workers <= 1 or max(height, width) <= self.tile_px:
+            return _edges(gray)
+
+        blurred = np.empty_like(gray)
+
+        def run(tile: Box) -> None:
+            x, y, w, h = tile
+            top, left = max(0, y - TILE_OVERLAP_PX), max(0, x - TILE_OVERLAP_PX)
+            bottom = min(height, y + h + TILE_OVERLAP_PX)
+            right = min(width, x + w + TILE_OVERLAP_PX)
+            tile_blurred = _bilateral(gray[top:bottom, left:right])
+            inner_y, inner_x = y - top, x - left
+            blurred[y : y + h, x : x + w] = tile_blurred[
+                inner_y : inner_y + h, inner_x : inner_x + w
+            ]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(run, _tiles(height, width, self.tile_px)))
+        return _edges_from_blurred(blurred)
+
+
+def _edges(gray: Any) -> Any:
+    return _edges_from_blurred(_bilateral(gray))
+
+
+def _bilateral(gray: Any) -> Any:
+    return cv2.bilateralFilter(gray, d=9, sigmaColor=75, sigmaSpace=75)
+
+
+def _edges_from_blurred(blurred: Any) -> Any:
+    edges = cv2.Canny(blurred, threshold1=50, threshold2=150)
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+    return cv2.dilate(edges, kernel, iterations=2)
+
+
+def _contours(edges: Any, min_area_px: float) -> List[Tuple[float, Box]]:
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    found: List[Tuple[float, Box]] = []
+    for contour in contours:
+        area = cv2.contourArea(contour)
+        if area < min_area_px:
+            continue
+        x, y, w, h = cv2.boundingRect(contour)
+        found.append((float(area), (x, y, w, h)))
+    return found
+
+
+def _tiles(height: int, width: int, size: int) -> Iterable[Box]:
+    for y in range(0, height, size):
+        for x in range(0, width, size):
+            yield x, y, min(size, width - x), min(size, height - y)
+
+
+def _scale_box(
+    box: Box, scale: float, shape: Tuple[int, int], *, as_corners: bool = False
+) -> Box:
+    """Map a box to another resolution, clipped to ``shape`` (height, width)."""
+    height, width = shape
+    x, y, w, h = box
+    left = min(width, max(0, int(x * scale)))
+    top = min(height, max(0, int(y * scale)))
+    right = min(width, max(left, int(round((x + w) * scale))))
+    bottom = min(height, max(top, int(round((y + h) * scale))))
+    if as_corners:
+        return left, top, right, bottom
+    return left, top, right - left, bottom - top
@@ -10,6 +10,7 @@ except ImportError:  # pragma: no cover - optional dependency
     cv2 = None  # type: ignore
 
 from shared.utils import require_dependency
+from .plan_image import PlanImage
 
 
 @dataclass
@@ -19,18 +20,21 @@ class DetectedSurface:
 
 
 def detect_surfaces_from_image(
-    image_path: str | Path, *, min_area_px: int = 10_000
+    image_path: str | Path | PlanImage, *, min_area_px: int = 10_000
 ) -> List[DetectedSurface]:
     """Detects large closed contours that may represent rooms or zones."""
     require_dependency(cv2, "opencv-python")
 
-    img_path = Path(image_path)
-    frame = cv2.imread(str(img_path))
-    if frame is None:
-        raise RuntimeError(f"Impossible de charger l'image {img_path}")
+    if isinstance(image_path, PlanImage):
+        image = image_path
+    else:
+        img_path = Path(image_path)
+        frame = cv2.imread(str(img_path))
+        if frame is None:
+            raise RuntimeError(f"Impossible de charger l'image {img_path}")
+        image = PlanImage(img_path, frame)
 
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    edges = cv2.Canny(gray, 50, 150)
+    edges = cv2.Canny(image.gray, 50, 150)
     contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
     detected: List[DetectedSurface] = []
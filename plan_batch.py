@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from importlib.util import find_spec
+from pathlib import Path
+from typing import List, Set
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from plan_ai.batch import BatchCheckpoint, BatchResult, expand_sources, iter_batch
+from plan_ai.geometry_calculator import measurements_to_dataframe
+from shared.utils import log_info
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Analyse un lot de plans (fichiers, dossiers ou motifs glob) sur plusieurs "
+            "processus et écrit les mesures dans un CSV/Parquet ou dans la base du backend."
+        )
+    )
+    parser.add_argument(
+        "sources",
+        nargs="+",
+        help="Fichiers, dossiers (parcourus récursivement) ou motifs ('archives/**/*.pdf').",
+    )
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument(
+        "--output",
+        help="Fichier de sortie .csv ou .parquet (les reprises y ajoutent leurs lignes).",
+    )
+    target.add_argument(
+        "--db",
+        action="store_true",
+        help="Enregistre chaque plan dans la table PlanRecord du backend.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="Fichier de reprise (par défaut: <sortie>.checkpoint.jsonl).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Nombre de processus d'analyse.",
+    )
+    parser.add_argument(
+        "--flush-every",
+        type=int,
+        default=50,
+        help="Nombre de plans écrits (et marqués comme faits) à la fois.",
+    )
+    parser.add_argument(
+        "--pdf-engine",
+        default="auto",
+        choices=["auto", "pdfium", "pdfplumber"],
+        help="Moteur d'extraction du texte des PDF.",
+    )
+    parser.add_argument(
+        "--no-ocr",
+        action="store_true",
+        help="N'applique pas l'OCR aux pages PDF sans texte.",
+    )
+    return parser.parse_args()
+
+
+class FileSink:
+    """Appends measurement rows to a CSV file or to a Parquet dataset directory.
+
+    Each row carries its plan's ``plan_key``. Plans already present in the
+    output are skipped, so rows written just before a crash (and before the
+    checkpoint) are not written twice on resume.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.parquet = path.suffix.lower() == ".parquet"
+        if path.suffix.lower() not in {".csv", ".parquet"}:
+            raise SystemExit("--output doit se terminer par .csv ou .parquet")
+        if self.parquet:
+            if not (find_spec("pyarrow") or find_spec("fastparquet")):
+                raise SystemExit(
+                    "La sortie Parquet nécessite 'pyarrow' (pip install pyarrow)."
+                )
+            self.path.mkdir(parents=True, exist_ok=True)
+        self.written = self._written_keys()
+
+    def _written_keys(self) -> Set[str]:
+        if not (any(self.path.glob("*.parquet")) if self.parquet else self.path.exists()):
+            return set()
+        try:
+            if self.parquet:
+                data = pd.read_parquet(self.path, columns=["plan_key"])
+            else:
+                data = pd.read_csv(self.path, usecols=["plan_key"])
+        except (KeyError, ValueError) as exc:
+            raise SystemExit(
+                f"{self.path} n'a pas de colonne plan_key (version précédente) : "
+                "utilisez un nouveau fichier de sortie."
+            ) from exc
+        return set(data["plan_key"].astype(str))
+
+    def write(self, results: List[BatchResult]) -> None:
+        frames = []
+        for result in results:
+            if result.error or not result.measurements or result.key in self.written:
+                continue
+            frame = measurements_to_dataframe(result.measurements)
+            frame.insert(0, "plan", result.path)
+            frame.insert(1, "plan_key", result.key)
+            frame.insert(2, "page", [m.page for m in result.measurements])
+            frame["source"] = [m.source for m in result.measurements]
+            frames.append(frame)
+        if not frames:
+            return
+        data = pd.concat(frames, ignore_index=True)
+        if self.parquet:
+            part = self.path / f"part-{time.time_ns()}.parquet"
+            data.to_parquet(part, index=False)
+        else:
+            data.to_csv(self.path, mode="a", header=not self.path.exists(), index=False)
+        self.written.update(data["plan_key"])
+
+
+class DatabaseSink:
+    """Bulk-inserts one PlanRecord per analysed plan.
+
+    A plan whose file (path and content hash) already has a record is
+    skipped, so resuming after a crash does not insert it twice.
+    """
+
+    def __init__(self) -> None:
+        from backend.app.database import get_session, init_db
+        from backend.app.models import PlanRecord
+        from backend.app.services.plan_service import PlanService
+        from sqlmodel import select
+
+        init_db()
+        self._get_session = get_session
+        self._select = select
+        self._record = PlanRecord
+        self._to_json = PlanService.measurements_to_json
+
+    def write(self, results: List[BatchResult]) -> None:
+        results = [result for result in results if result.summary is not None]
+        if not results:
+            return
+        with self._get_session() as session:
+            existing = set(
+                session.exec(
+                    self._select(self._record.stored_path, self._record.content_hash).where(
+                        self._record.stored_path.in_([result.path for result in results])
+                    )
+                ).all()
+            )
+            records = [
+                self._record(
+                    filename=Path(result.path).name,
+                    stored_path=result.path,
+                    measurement_count=result.summary.measurement_count,
+                    total_area_m2=result.summary.total_area_m2,
+                    total_length_m=result.summary.total_length_m,
+                    dominant_label=result.summary.dominant_label,
+                    measurements_json=self._to_json(result.measurements),
+                    content_hash=result.content_hash,
+                    # No room detection here: not interchangeable with API analyses.
+                    analysis_key=None,
+                )
+                for result in results
+                if (result.path, result.content_hash) not in existing
+            ]
+            if records:
+                session.add_all(records)
+                session.commit()
+
+
+def main() -> None:
+    load_dotenv()
+    args = parse_arguments()
+
+    sink = DatabaseSink() if args.db else FileSink(Path(args.output))
+    checkpoint_path = args.checkpoint or (
+        "plan_batch.checkpoint.jsonl" if args.db else f"{args.output}.checkpoint.jsonl"
+    )
+    checkpoint = BatchCheckpoint(checkpoint_path)
+
+    paths = expand_sources(args.sources)
+    log_info(
+        f"{len(paths)} plan(s) trouvé(s), {len(checkpoint.done)} déjà traité(s) "
+        f"d'après {checkpoint_path}"
+    )
+
+    reader_options = {"pdf_engine": args.pdf_engine, "ocr_fallback": not args.no_ocr}
+    started = time.perf_counter()
+    plans = pages = errors = 0
+    buffer: List[BatchResult] = []
+
+    def flush() -> None:
+        # Results are written before being checkpointed: after a crash a plan
+        # may be analysed again, but the sinks skip plans already written.
+        sink.write(buffer)
+        checkpoint.mark(buffer)
+        buffer.clear()
+
+    for result in iter_batch(
+        paths, workers=args.workers, reader_options=reader_options, skip=checkpoint
+    ):
+        plans += 1
+        pages += result.page_count
+        if result.error:
+            errors += 1
+            log_info(f"Échec: {result.path} ({result.error})")
+        buffer.append(result)
+        if len(buffer) >= args.flush_every:
+            flush()
+            log_info(f"{plans} plan(s) analysé(s)...")
+    flush()
+
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    log_info(
+        f"Terminé: {plans} plan(s), {pages} page(s), {errors} échec(s) en {elapsed:.1f} s "
+        f"| {plans / elapsed:.2f} plans/s | {pages / elapsed:.2f} pages/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+from __future__ import annotations
+
+import asyncio
+import codecs
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterable, List, Mapping, Optional
+
+import httpx
+
+from .google_search import (
+    AsyncGoogleSearchClient,
+    GoogleSearchError,
+    QuotaExhaustedError,
+)
+from .http_transport import HttpTransport, TransportConfig, build_async_client
+from .page_cache import CachedPage, PageCache
+from .price_parser import ParsedPrice
+from .price_service import (
+    PAGE_CHUNK_BYTES,
+    PAGE_MAX_BYTES,
+    PAGE_TIMEOUT_S,
+    REQUEST_HEADERS,
+    SNIPPET_CONFIDENCE_THRESHOLD,
+    StorePrice,
+    fallback_store_price,
+    select_snippet_price,
+)
+from .rate_limit import SearchThrottle
+from .search_cache import SearchCache
+from .store_parsers import IncrementalPriceDetector, parse_price_from_html
+from .stores import STORES, Store
+
+
+@dataclass
+class BulkPrice:
+    product: str
+    store_price: StorePrice
+
+
+def product_key(product: str) -> str:
+    """Identity of a product name, ignoring case and spacing."""
+    return " ".join(product.split()).casefold()
+
+
+def unique_products(products: Iterable[str]) -> List[str]:
+    """Drop blank lines and repeated products (see :func:`product_key`).
+
+    The first spelling of each product is kept, in input order.
+    """
+    seen: Dict[str, str] = {}
+    for product in products:
+        cleaned = " ".join(product.split())
+        if cleaned:
+            seen.setdefault(product_key(cleaned), cleaned)
+    return list(seen.values())
+
+
+class AsyncPriceLookupService:
+    """Google search + store page parsing on one pooled async client.
+
+    A single instance is meant to live for the whole process: its
+    ``httpx.AsyncClient`` keeps connections to Google and the stores alive
+    between lookups. Call :meth:`aclose` on shutdown. A client taken from a
+    shared ``transport`` belongs to that transport and is closed by it.
+    Blocking callers go through :class:`~.price_service.PriceLookupService`.
+    """
+
+    def __init__(
+        self,
+        *,
+        client: Optional[AsyncGoogleSearchClient] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        transport: Optional[HttpTransport] = None,
+        max_connections: int = 100,
+        per_store_concurrency: int = 3,
+        cache: Optional[SearchCache] = None,
+        page_cache: Optional[PageCache] = None,
+        throttle: Optional[SearchThrottle] = None,
+        page_max_bytes: int = PAGE_MAX_BYTES,
+        snippet_threshold: float = SNIPPET_CONFIDENCE_THRESHOLD,
+    ) -> None:
+        if http_client is None and transport is not None:
+            http_client = transport.async_client()
+        self._owns_http = http_client is None
+        self._http = http_client or build_async_client(
+            TransportConfig(max_connections=max_connections), headers=REQUEST_HEADERS
+        )
+        self._client = client or AsyncGoogleSearchClient(
+            http_client=self._http, cache=cache, throttle=throttle
+        )
+        self._per_store_concurrency = max(1, per_store_concurrency)
+        self._page_cache = page_cache
+        self._page_max_bytes = max(PAGE_CHUNK_BYTES, page_max_bytes)
+        self._snippet_threshold = snippet_threshold
+
+    async def lookup(
+        self,
+        product: str,
+        *,
+        per_store_results: int = 3,
+        deadline_s: Optional[float] = None,
+    ) -> List[StorePrice]:
+        per_store_results = max(1, min(per_store_results, 10))
+        deadline = time.monotonic() + deadline_s if deadline_s else None
+        tasks = [
+            asyncio.ensure_future(
+                self._find_price_for_store(
+                    store,
+                    product,
+                    per_store_results=per_store_results,
+                    deadline=deadline,
+                )
+            )
+            for store in STORES
+        ]
+        done, pending = await asyncio.wait(tasks, timeout=deadline_s)
+        for task in pending:
+            task.cancel()
+        # Retrieve every error, so none is reported as unhandled; the first
+        # store's is raised.
+        errors = [task.exception() for task in tasks if task in done and task.exception()]
+        if errors:
+            raise errors[0]
+
+        results: List[StorePrice] = []
+        for store, task in zip(STORES, tasks):
+            if task in done:
+                results.append(task.result())
+            else:
+                results.append(
+                    StorePrice(store=store, result=None, price=None, source="timeout")
+                )
+        return results
+
+    async def lookup_many(
+        self,
+        products: Iterable[str],
+        *,
+        per_store_results: int = 3,
+        max_concurrent_searches: int = 10,
+        per_store_concurrency: Optional[int] = None,
+        deadline_s: Optional[float] = None,
+    ) -> AsyncIterator[BulkPrice]:
+        """Price a list of products in every store, yielding pairs as they complete.
+
+        Repeated products are searched once (see :func:`unique_products`). All
+        (product, store) searches are scheduled at once on the shared client;
+        at most ``max_concurrent_searches`` Google requests and
+        ``per_store_concurrency`` page downloads per store are in flight, so the
+        wall time depends on those limits rather than on the number of lines.
+        A failed search is reported with ``source="error"`` (``"quota"`` once
+        the daily Google quota is spent) instead of aborting the whole run;
+        pairs still running at ``deadline_s`` come out as
+        ``"timeout"``.
+        """
+        per_store_results = max(1, min(per_store_results, 10))
+        deadline = time.monotonic() + deadline_s if deadline_s else None
+        search_slots = asyncio.Semaphore(max(1, max_concurrent_searches))
+        page_slots = {
+            store.name: asyncio.Semaphore(
+                max(1, per_store_concurrency or self._per_store_concurrency)
+            )
+            for store in STORES
+        }
+
+        async def price(product: str, store: Store) -> BulkPrice:
+            try:
+                store_price = await self._find_price_for_store(
+                    store,
+                    product,
+                    per_store_results=per_store_results,
+                    deadline=deadline,
+                    search_slots=search_slots,
+                    page_slots=page_slots[store.name],
+                )
+            except RuntimeError:
+                store_price = StorePrice(store=store, result=None, price=None, source="error")
+            return BulkPrice(product=product, store_price=store_price)
+
+        pairs = [(product, store) for product in unique_products(products) for store in STORES]
+        tasks = [asyncio.ensure_future(price(product, store)) for product, store in pairs]
+        order = {task: index for index, task in enumerate(tasks)}
+        pending = set(tasks)
+        try:
+            while pending:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for task in sorted(done, key=order.__getitem__):
+                    yield task.result()
+            # Every finished pair has been yielded; what is left hit the deadline.
+            for task in sorted(pending, key=order.__getitem__):
+                product, store = pairs[order[task]]
+                yield BulkPrice(
+                    product=product,
+                    store_price=StorePrice(store=store, result=None, price=None, source="timeout"),
+                )
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def aclose(self) -> None:
+        if self._owns_http:
+            await self._http.aclose()
+
+    async def __aenter__(self) -> "AsyncPriceLookupService":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def _find_price_for_store(
+        self,
+        store: Store,
+        product: str,
+        *,
+        per_store_results: int,
+        deadline: Optional[float],
+        search_slots: Optional[asyncio.Semaphore] = None,
+        page_slots: Optional[asyncio.Semaphore] = None,
+    ) -> StorePrice:
+        query = store.build_query(product)
+        try:
+            async with search_slots or nullcontext():
+                results = await self._client.search(query, num_results=per_store_results)
+        except QuotaExhaustedError:
+            return StorePrice(store=store, result=None, price=None, source="quota")
+        except GoogleSearchError as error:
+            raise RuntimeError(
+                f"Erreur lors de la requête Google pour {store.name}: {error}"
+            ) from error
+
+        selection = select_snippet_price(
+            store, product, results, threshold=self._snippet_threshold
+        )
+        if selection.confident:
+            return selection.confident
+
+        slots = page_slots or asyncio.Semaphore(self._per_store_concurrency)
+        fetches = {
+            asyncio.ensure_future(
+                self._fetch_limited(result.link, store=store, slots=slots, deadline=deadline)
+            ): result
+            for result in selection.candidates
+        }
+        pending = set(fetches)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for fetch in done:
+                    price = fetch.result()
+                    if price:
+                        return StorePrice(
+                            store=store, result=fetches[fetch], price=price, source="page"
+                        )
+        finally:
+            for fetch in fetches:
+                fetch.cancel()
+
+        return selection.best or fallback_store_price(store, results)
+
+    async def _fetch_limited(
+        self,
+        url: str,
+        *,
+        store: Store,
+        slots: asyncio.Semaphore,
+        deadline: Optional[float],
+    ) -> Optional[ParsedPrice]:
+        async with slots:
+            timeout = PAGE_TIMEOUT_S
+            if deadline is not None:
+                timeout = max(1.0, min(timeout, deadline - time.monotonic()))
+            return await self._fetch_price_from_page(url, store=store, timeout=timeout)
+
+    async def _fetch_price_from_page(
+        self, url: str, *, store: Store, timeout: float = PAGE_TIMEOUT_S
+    ) -> Optional[ParsedPrice]:
+        # Page cache reads and writes are SQLite + zlib work on whole pages;
+        # like the full-page parse below, they run off the event loop.
+        cached = (
+            await asyncio.to_thread(self._page_cache.get, url) if self._page_cache else None
+        )
+        try:
+            async with self._http.stream(
+                "GET", url, headers=page_request_headers(cached), timeout=timeout
+            ) as response:
+                if response.status_code == 304:
+                    return await asyncio.to_thread(
+                        not_modified_price, self._page_cache, url, cached, store=store
+                    )
+                response.raise_for_status()
+                download = PageDownload(
+                    store, encoding=response.encoding, max_bytes=self._page_max_bytes
+                )
+                async for chunk in response.aiter_bytes(PAGE_CHUNK_BYTES):
+                    if download.feed(chunk):
+                        break
+        except httpx.HTTPError:
+            return None
+
+        price = await asyncio.to_thread(download.finish)
+        if self._page_cache is not None:
+            await asyncio.to_thread(
+                download.remember, self._page_cache, url, cached, headers=response.headers
+            )
+        return price
+
+
+class PageDownload:
+    """Streamed page body fed to an :class:`IncrementalPriceDetector`.
+
+    :meth:`feed` asks to stop reading once a price is confirmed or
+    ``max_bytes`` have been received; the connection is then dropped. The
+    page cache then keeps the part that was read, with the response's
+    validators: it holds everything the price came from, so a later 304
+    parses back to the same price.
+    """
+
+    def __init__(self, store: Store, *, encoding: Optional[str], max_bytes: int) -> None:
+        self.detector = IncrementalPriceDetector(domain=store.domain)
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+        try:
+            decoder = codecs.getincrementaldecoder(encoding or "utf-8")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")
+        self._decoder = decoder(errors="replace")
+
+    def feed(self, chunk: bytes) -> bool:
+        """Process a chunk; ``True`` means the rest of the body is not needed."""
+        chunk = chunk[: self.max_bytes - self.bytes_read]
+        self.bytes_read += len(chunk)
+        if self.detector.feed(self._decoder.decode(chunk)):
+            return True
+        return self.bytes_read >= self.max_bytes
+
+    def finish(self) -> Optional[ParsedPrice]:
+        self.detector.feed(self._decoder.decode(b"", final=True))
+        return self.detector.close()
+
+    def remember(
+        self,
+        page_cache: Optional[PageCache],
+        url: str,
+        cached: Optional[CachedPage],
+        *,
+        headers: Mapping[str, str],
+    ) -> None:
+        if page_cache is not None:
+            page_cache.resolve(
+                url,
+                cached,
+                status_code=200,
+                headers=headers,
+                text=self.detector.text,
+            )
+
+
+def page_request_headers(cached: Optional[CachedPage]) -> Dict[str, str]:
+    if cached is None:
+        return REQUEST_HEADERS
+    return {**REQUEST_HEADERS, **cached.conditional_headers()}
+
+
+def not_modified_price(
+    page_cache: Optional[PageCache],
+    url: str,
+    cached: Optional[CachedPage],
+    *,
+    store: Store,
+) -> Optional[ParsedPrice]:
+    """Price of a page answered with 304, from its cached copy."""
+    if page_cache is None:
+        return None
+    text = page_cache.resolve(url, cached, status_code=304, headers={}, text=None)
+    return parse_store_page(text, store=store) if text is not None else None
+
+
+def parse_store_page(text: str, *, store: Store) -> Optional[ParsedPrice]:
+    return parse_price_from_html(text, domain=store.domain)
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def _page_timeout(deadline: Optional[float]) -> float:
+    remaining = _remaining(deadline)
+    if remaining is None:
+        return PAGE_TIMEOUT_S
+    return max(1.0, min(PAGE_TIMEOUT_S, remaining))
@@ -1,17 +1,30 @@
 from __future__ import annotations
 
+import asyncio
 import os
-from dataclasses import dataclass
+import time
+from dataclasses import asdict, dataclass
 from typing import Any, Dict, List, Optional
 
+import httpx
 import requests
 from requests import Response
 
+from .http_transport import get_default_transport
+from .rate_limit import SearchThrottle
+from .search_cache import SearchCache, make_cache_key
+
+SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+
 
 class GoogleSearchError(RuntimeError):
     """Raised when the Google Search API request fails."""
 
 
+class QuotaExhaustedError(GoogleSearchError):
+    """Raised in cache-only mode for a query that is not cached."""
+
+
 @dataclass
 class GoogleSearchResult:
     title: str
@@ -28,10 +41,14 @@ class GoogleSearchClient:
         api_key: Optional[str] = None,
         cse_id: Optional[str] = None,
         session: Optional[requests.Session] = None,
+        cache: Optional[SearchCache] = None,
+        throttle: Optional[SearchThrottle] = None,
     ) -> None:
         self._api_key = api_key or os.getenv("GOOGLE_API_KEY")
         self._cse_id = cse_id or os.getenv("GOOGLE_CSE_ID")
-        self._session = session or requests.Session()
+        self._session = session or get_default_transport().session
+        self.cache = cache
+        self.throttle = throttle
 
         if not self._api_key:
             raise ValueError(
@@ -45,31 +62,34 @@ class GoogleSearchClient:
 
     def search(self, query: str, *, num_results: int = 5) -> List[GoogleSearchResult]:
         """Execute a query and return structured search results."""
-        params: Dict[str, Any] = {
-            "key": self._api_key,
-            "cx": self._cse_id,
-            "q": query,
-            "num": max(1, min(num_results, 10)),  # API caps per-request results at 10
-            "lr": "lang_fr",
-            "gl": "fr",
-        }
-        response = self._session.get(
-            "https://www.googleapis.com/customsearch/v1", params=params, timeout=10
-        )
+        params = _build_params(self._api_key, self._cse_id, query, num_results)
+        cached = _cache_lookup(self.cache, params)
+        if cached is not None:
+            return cached
+        response = self._get(params)
         self._raise_for_status(response)
-        payload = response.json()
-        items = payload.get("items", [])
-        results: List[GoogleSearchResult] = []
-        for item in items:
-            results.append(
-                GoogleSearchResult(
-                    title=item.get("title", ""),
-                    link=item.get("link", ""),
-                    snippet=item.get("snippet", ""),
-                )
-            )
+        results = _parse_results(response.json())
+        _cache_store(self.cache, params, results)
         return results
 
+    def _get(self, params: Dict[str, Any]) -> Response:
+        throttle = self.throttle
+        attempt = 0
+        while True:
+            if throttle is not None:
+                _admit(throttle)
+                throttle.bucket.acquire()
+            response = self._session.get(SEARCH_URL, params=params, timeout=10)
+            if throttle is None:
+                return response
+            delay = throttle.retry_delay(
+                attempt, response.status_code, response.headers, response.text
+            )
+            if delay is None:
+                return response
+            attempt += 1
+            time.sleep(delay)
+
     @staticmethod
     def _raise_for_status(response: Response) -> None:
         try:
@@ -81,3 +101,135 @@ class GoogleSearchClient:
             except ValueError:
                 details = response.text
             raise GoogleSearchError(f"{message}: {details}") from exc
+
+
+class AsyncGoogleSearchClient:
+    """Asyncio counterpart of :class:`GoogleSearchClient` built on ``httpx``."""
+
+    def __init__(
+        self,
+        *,
+        api_key: Optional[str] = None,
+        cse_id: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[SearchCache] = None,
+        throttle: Optional[SearchThrottle] = None,
+    ) -> None:
+        self._api_key = api_key or os.getenv("GOOGLE_API_KEY")
+        self._cse_id = cse_id or os.getenv("GOOGLE_CSE_ID")
+        self.cache = cache
+        self.throttle = throttle
+        self._owns_client = http_client is None
+        self._http = http_client or httpx.AsyncClient(timeout=10)
+
+        if not self._api_key:
+            raise ValueError(
+                "Google API key not provided. Set the GOOGLE_API_KEY environment variable."
+            )
+        if not self._cse_id:
+            raise ValueError(
+                "Google Custom Search Engine ID not provided. "
+                "Set the GOOGLE_CSE_ID environment variable."
+            )
+
+    async def search(
+        self, query: str, *, num_results: int = 5
+    ) -> List[GoogleSearchResult]:
+        params = _build_params(self._api_key, self._cse_id, query, num_results)
+        # The cache, quota and throttle state may sit in SQLite: their calls
+        # run in a thread rather than blocking the event loop.
+        cached = await asyncio.to_thread(_cache_lookup, self.cache, params)
+        if cached is not None:
+            return cached
+        response = await self._get(params)
+        if response.is_error:
+            try:
+                details = response.json()
+            except ValueError:
+                details = response.text
+            raise GoogleSearchError(f"Google Search API request failed: {details}")
+        results = _parse_results(response.json())
+        await asyncio.to_thread(_cache_store, self.cache, params, results)
+        return results
+
+    async def _get(self, params: Dict[str, Any]) -> httpx.Response:
+        throttle = self.throttle
+        attempt = 0
+        while True:
+            if throttle is not None:
+                await asyncio.to_thread(_admit, throttle)
+                await throttle.bucket.acquire_async()
+            try:
+                response = await self._http.get(SEARCH_URL, params=params, timeout=10)
+            except httpx.HTTPError as exc:
+                raise GoogleSearchError(f"Google Search API request failed: {exc}") from exc
+            if throttle is None:
+                return response
+            delay = await asyncio.to_thread(
+                throttle.retry_delay,
+                attempt,
+                response.status_code,
+                response.headers,
+                response.text,
+            )
+            if delay is None:
+                return response
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        if self._owns_client:
+            await self._http.aclose()
+
+
+def _admit(throttle: SearchThrottle) -> None:
+    if not throttle.admit():
+        raise QuotaExhaustedError(
+            "Google Search daily quota nearly exhausted: serving cached results only"
+        )
+
+
+def _build_params(
+    api_key: Optional[str], cse_id: Optional[str], query: str, num_results: int
+) -> Dict[str, Any]:
+    return {
+        "key": api_key,
+        "cx": cse_id,
+        "q": query,
+        "num": max(1, min(num_results, 10)),  # API caps per-request results at 10
+        "lr": "lang_fr",
+        "gl": "fr",
+    }
+
+
+def _parse_results(payload: Dict[str, Any]) -> List[GoogleSearchResult]:
+    return [
+        GoogleSearchResult(
+            title=item.get("title", ""),
+            link=item.get("link", ""),
+            snippet=item.get("snippet", ""),
+        )
+        for item in payload.get("items", [])
+    ]
+
+
+def _cache_key(params: Dict[str, Any]) -> str:
+    return make_cache_key(params["q"], params["num"], params["lr"], params["gl"])
+
+
+def _cache_lookup(
+    cache: Optional[SearchCache], params: Dict[str, Any]
+) -> Optional[List[GoogleSearchResult]]:
+    if cache is None:
+        return None
+    payload = cache.get(_cache_key(params))
+    if payload is None:
+        return None
+    return [GoogleSearchResult(**item) for item in payload]
+
+
+def _cache_store(
+    cache: Optional[SearchCache], params: Dict[str, Any], results: List[GoogleSearchResult]
+) -> None:
+    if cache is not None:
+        cache.set(_cache_key(params), [asdict(result) for result in results])
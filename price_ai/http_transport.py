@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from importlib.util import find_spec
+from typing import Callable, Dict, Mapping, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from shared.utils import log_info
+
+GOOGLE_API_HOST = "www.googleapis.com"
+RETRY_STATUSES = (502, 503, 504)
+
+
+@dataclass
+class TransportConfig:
+    """Connection pooling options of :class:`HttpTransport`.
+
+    ``pool_maxsize`` is the number of keep-alive connections kept per host,
+    overridden per host name by ``host_pool_sizes``. ``max_connections``
+    bounds the async client as a whole (httpx has no per-host limit; the
+    lookup services cap concurrency per store themselves).
+    """
+
+    pool_maxsize: int = 10
+    host_pool_sizes: Dict[str, int] = field(default_factory=dict)
+    max_connections: int = 100
+    keepalive_expiry_s: float = 30.0
+    http2: bool = False
+    retries: int = 2
+    backoff_factor: float = 0.3
+
+
+class HttpTransport:
+    """Pooled HTTP clients shared by the Google and store requests.
+
+    The ``requests`` session mounts one adapter per configured host plus a
+    default one. Each adapter keeps its connections alive, so TLS handshakes
+    and DNS lookups are paid once per connection rather than per request.
+    Store requests retry connection errors and 502/503/504 with backoff,
+    honouring Retry-After. The Google API adapter only retries connection
+    errors, since its status codes are handled by the search throttle.
+    The async client is created on first use and must then stay on one event
+    loop; close it with :meth:`aclose`.
+    """
+
+    def __init__(self, config: Optional[TransportConfig] = None) -> None:
+        self.config = config or TransportConfig()
+        self._lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_requests: Counter = Counter()
+
+    @property
+    def session(self) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                self._session = self._build_session()
+            return self._session
+
+    def async_client(self) -> httpx.AsyncClient:
+        with self._lock:
+            if self._async_client is None:
+                self._async_client = build_async_client(
+                    self.config, on_request=self._count_async_request
+                )
+            return self._async_client
+
+    def stats(self) -> dict:
+        """Per-host connections opened, requests sent and idle connections."""
+        with self._lock:
+            session, client = self._session, self._async_client
+        return {
+            "sync": _session_stats(session) if session is not None else {},
+            "async": _async_client_stats(client, self._async_requests)
+            if client is not None
+            else {},
+            "http2": bool(client is not None and self.config.http2 and _has_h2()),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+    async def aclose(self) -> None:
+        with self._lock:
+            client, self._async_client = self._async_client, None
+        if client is not None:
+            await client.aclose()
+
+    def _build_session(self) -> requests.Session:
+        config = self.config
+        session = requests.Session()
+        default = _adapter(config.pool_maxsize, _store_retry(config))
+        session.mount("https://", default)
+        session.mount("http://", default)
+        sizes = {GOOGLE_API_HOST: config.pool_maxsize, **config.host_pool_sizes}
+        for host, size in sizes.items():
+            retry = _store_retry(config)
+            if host == GOOGLE_API_HOST:
+                retry = Retry(total=config.retries, read=0, status=0, redirect=0)
+            adapter = _adapter(size, retry)
+            session.mount(f"https://{host}/", adapter)
+            session.mount(f"http://{host}/", adapter)
+        return session
+
+    def _count_async_request(self, request: httpx.Request) -> None:
+        self._async_requests[request.url.host] += 1
+
+
+def build_async_client(
+    config: Optional[TransportConfig] = None,
+    *,
+    headers: Optional[Mapping[str, str]] = None,
+    on_request: Optional[Callable[[httpx.Request], None]] = None,
+) -> httpx.AsyncClient:
+    config = config or TransportConfig()
+    http2 = config.http2 and _has_h2()
+    if config.http2 and not http2:
+        log_info("HTTP/2 demandé mais le paquet 'h2' est absent: HTTP/1.1 utilisé.")
+
+    async def hook(request: httpx.Request) -> None:
+        on_request(request)
+
+    return httpx.AsyncClient(
+        headers=headers,
+        follow_redirects=True,
+        # Connection-level retries only: status codes are the callers' business.
+        transport=httpx.AsyncHTTPTransport(
+            retries=config.retries,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_connections,
+                keepalive_expiry=config.keepalive_expiry_s,
+            ),
+        ),
+        event_hooks={"request": [hook]} if on_request else None,
+    )
+
+
+def parse_host_pool_sizes(value: str) -> Dict[str, int]:
+    """Parse ``"www.castorama.fr=20,www.pointp.fr=8"`` into a mapping."""
+    sizes: Dict[str, int] = {}
+    for item in value.split(","):
+        host, _, size = item.partition("=")
+        if host.strip() and size.strip():
+            sizes[host.strip().lower()] = int(size)
+    return sizes
+
+
+_default_transport: Optional[HttpTransport] = None
+_default_lock = threading.Lock()
+
+
+def get_default_transport() -> HttpTransport:
+    """Process-wide transport used by clients created without a session."""
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = HttpTransport()
+        return _default_transport
+
+
+def _adapter(pool_maxsize: int, retry: Retry) -> HTTPAdapter:
+    return HTTPAdapter(
+        pool_connections=16, pool_maxsize=max(1, pool_maxsize), max_retries=retry
+    )
+
+
+def _store_retry(config: TransportConfig) -> Retry:
+    return Retry(
+        total=config.retries,
+        backoff_factor=config.backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def _session_stats(session: requests.Session) -> Dict[str, dict]:
+    hosts: Dict[str, dict] = {}
+    adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+    for adapter in adapters.values():
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats = hosts.setdefault(
+                pool.host, {"connections_opened": 0, "requests": 0, "idle": 0}
+            )
+            stats["connections_opened"] += pool.num_connections
+            stats["requests"] += pool.num_requests
+            idle = list(pool.pool.queue) if pool.pool is not None else []
+            stats["idle"] += sum(1 for conn in idle if conn is not None)
+    return hosts
+
+
+def _async_client_stats(client: httpx.AsyncClient, requests_by_host: Counter) -> Dict[str, dict]:
+    """Requests sent per host, plus the pool's connections when they can be read.
+
+    httpx has no public API for its pool: connections are read from private
+    httpcore attributes, and reported as ``"unavailable"`` when a release
+    changes them rather than failing the stats endpoint.
+    """
+    hosts: Dict[str, dict] = {
+        host: {"requests": count, "connections": 0, "idle": 0}
+        for host, count in requests_by_host.items()
+    }
+    try:
+        connections = [
+            (connection._origin.host.decode("ascii"), connection.is_idle())
+            for connection in list(client._transport._pool.connections)
+        ]
+    except Exception:
+        for stats in hosts.values():
+            stats["connections"] = stats["idle"] = "unavailable"
+        return hosts
+    for host, idle in connections:
+        stats = hosts.setdefault(host, {"requests": 0, "connections": 0, "idle": 0})
+        stats["connections"] += 1
+        if idle:
+            stats["idle"] += 1
+    return hosts
+
+
+def _has_h2() -> bool:
+    return find_spec("h2") is not None
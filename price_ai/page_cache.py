@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+
+from .search_cache import CacheStats
+
+
+@dataclass
+class CachedPage:
+    url: str
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """Store product pages for conditional GETs.
+
+    Bodies are zlib-compressed in a SQLite file together with their ETag and
+    Last-Modified validators. Once the compressed total exceeds ``max_bytes``
+    the least recently used pages are dropped. Only pages that carry a
+    validator are kept, since nothing else can be revalidated.
+    ``stats.hits`` counts 304 responses served from the local copy.
+    """
+
+    def __init__(self, path: str | Path, *, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.stats = CacheStats()
+        self._max_bytes = max(1, max_bytes)
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS page_cache ("
+                " url TEXT PRIMARY KEY,"
+                " body BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " etag TEXT,"
+                " last_modified TEXT,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_page_cache_accessed_at"
+                " ON page_cache (accessed_at)"
+            )
+            (total,) = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM page_cache"
+            ).fetchone()
+        self._total_bytes = int(total)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified FROM page_cache WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE page_cache SET accessed_at = ? WHERE url = ?", (time.time(), url)
+            )
+        body = zlib.decompress(row[0]).decode("utf-8")
+        return CachedPage(url=url, body=body, etag=row[1], last_modified=row[2])
+
+    def resolve(
+        self,
+        url: str,
+        cached: Optional[CachedPage],
+        *,
+        status_code: int,
+        headers: Mapping[str, str],
+        text: Optional[str],
+    ) -> Optional[str]:
+        """Return the page body for a response to a (possibly conditional) GET.
+
+        A 304 is answered from ``cached``; a fresh body is stored when the
+        server sent a validator. ``text`` is only read for non-304 responses.
+        """
+        if status_code == 304 and cached is not None:
+            with self._lock:
+                self.stats.hits += 1
+            return cached.body
+
+        with self._lock:
+            self.stats.misses += 1
+        if text is None:
+            return None
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if etag or last_modified:
+            self.store(url, text, etag=etag, last_modified=last_modified)
+        return text
+
+    def store(
+        self,
+        url: str,
+        body: str,
+        *,
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ) -> None:
+        blob = zlib.compress(body.encode("utf-8"), 6)
+        with self._lock, self._conn:
+            previous = self._conn.execute(
+                "SELECT size FROM page_cache WHERE url = ?", (url,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO page_cache"
+                " (url, body, size, etag, last_modified, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (url, blob, len(blob), etag, last_modified, time.time()),
+            )
+            self._total_bytes += len(blob) - (previous[0] if previous else 0)
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        while self._total_bytes > self._max_bytes:
+            rows = self._conn.execute(
+                "SELECT url, size FROM page_cache ORDER BY accessed_at LIMIT 32"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            for url, size in rows:
+                if self._total_bytes <= self._max_bytes:
+                    return
+                self._conn.execute("DELETE FROM page_cache WHERE url = ?", (url,))
+                self._total_bytes -= size
+                self.stats.evictions += 1
+
+    def describe(self) -> dict:
+        return {**self.stats.as_dict(), "total_bytes": self._total_bytes}
+
+    def close(self) -> None:
+        self._conn.close()
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional, Tuple
 
 
 PRICE_PATTERN = re.compile(
@@ -24,7 +24,20 @@ def extract_price(text: str) -> Optional[ParsedPrice]:
     match = PRICE_PATTERN.search(text)
     if not match:
         return None
+    return _parse_match(match)
 
+
+def find_prices(text: str) -> List[Tuple[ParsedPrice, int, int]]:
+    """Every price in ``text`` with the (start, end) span of its match."""
+    found: List[Tuple[ParsedPrice, int, int]] = []
+    for match in PRICE_PATTERN.finditer(text or ""):
+        price = _parse_match(match)
+        if price:
+            found.append((price, match.start(), match.end()))
+    return found
+
+
+def _parse_match(match: "re.Match[str]") -> Optional[ParsedPrice]:
     raw_price = match.group(1)
     normalized = (
         raw_price.replace(" ", "")
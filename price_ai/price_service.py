@@ -1,19 +1,32 @@
 from __future__ import annotations
 
-import html
+import asyncio
+import re
+import threading
+import unicodedata
 from dataclasses import dataclass
-from typing import Iterable, List, Optional
+from typing import Any, Coroutine, Iterable, List, Optional, Set, Tuple, TypeVar
 
-import requests
+from .google_search import AsyncGoogleSearchClient, GoogleSearchResult
+from .http_transport import HttpTransport
+from .page_cache import PageCache
+from .price_parser import ParsedPrice, find_prices
+from .rate_limit import SearchThrottle
+from .search_cache import SearchCache
+from .stores import Store
 
-from .google_search import (
-    GoogleSearchClient,
-    GoogleSearchError,
-    GoogleSearchResult,
+_T = TypeVar("_T")
+
+# Numbers and words are split apart, so "35kg" and "35 kg" give the same words.
+_WORD_RE = re.compile(r"\d+(?:[.,]\d+)?|[^\W\d_]{2,}")
+_STOPWORDS = {"de", "du", "des", "la", "le", "les", "en", "et", "pour", "avec", "sans", "un", "une"}
+# Prices per unit, starting prices, delivery fees and discounts are not the
+# price of the item itself.
+_PRICE_QUALIFIER_RE = re.compile(
+    r"/\s*(?:m²|m2|m³|m3|ml|kg|l|m|u)\b|\b(?:le|la|par)\s+(?:m²|m2|m³|m3|ml|kg|litre|mètre|unité)\b"
+    r"|à partir de|\bdès\b|livraison|frais de port|économi|remise|réduction|reprise|éco-part",
+    re.I,
 )
-from .price_parser import ParsedPrice, extract_price
-from .store_parsers import parse_price_from_html
-from .stores import STORES, Store
 
 
 REQUEST_HEADERS = {
@@ -25,6 +38,11 @@ REQUEST_HEADERS = {
     "Accept-Language": "fr-FR,fr;q=0.9",
 }
 
+PAGE_TIMEOUT_S = 12.0
+SNIPPET_CONFIDENCE_THRESHOLD = 0.6
+PAGE_CHUNK_BYTES = 64 * 1024
+PAGE_MAX_BYTES = 4 * 1024 * 1024
+
 
 @dataclass
 class StorePrice:
@@ -35,91 +53,193 @@ class StorePrice:
 
 
 class PriceLookupService:
-    """Encapsulates Google search + site parsing to retrieve store prices."""
+    """Blocking front end of :class:`~.async_price_service.AsyncPriceLookupService`.
+
+    The async service does the work: its event loop runs in a daemon thread
+    started on the first lookup, so the pooled client stays on one loop from
+    one lookup to the next. Call :meth:`close` to release the connections.
+    """
 
     def __init__(
         self,
         *,
-        client: Optional[GoogleSearchClient] = None,
-        session: Optional[requests.Session] = None,
+        client: Optional[AsyncGoogleSearchClient] = None,
+        transport: Optional[HttpTransport] = None,
+        max_connections: int = 100,
+        per_store_concurrency: int = 3,
+        cache: Optional[SearchCache] = None,
+        page_cache: Optional[PageCache] = None,
+        throttle: Optional[SearchThrottle] = None,
+        page_max_bytes: int = PAGE_MAX_BYTES,
+        snippet_threshold: float = SNIPPET_CONFIDENCE_THRESHOLD,
     ) -> None:
-        self._client = client or GoogleSearchClient()
-        self._session = session or requests.Session()
+        from .async_price_service import AsyncPriceLookupService
 
-    def lookup(
-        self, product: str, *, per_store_results: int = 3
-    ) -> List[StorePrice]:
-        per_store_results = max(1, min(per_store_results, 10))
-        results: List[StorePrice] = []
-        for store in STORES:
-            results.append(
-                self._find_price_for_store(
-                    store,
-                    product,
-                    per_store_results=per_store_results,
-                )
-            )
-        return results
+        self._service = AsyncPriceLookupService(
+            client=client,
+            transport=transport,
+            max_connections=max_connections,
+            per_store_concurrency=per_store_concurrency,
+            cache=cache,
+            page_cache=page_cache,
+            throttle=throttle,
+            page_max_bytes=page_max_bytes,
+            snippet_threshold=snippet_threshold,
+        )
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
 
-    def _find_price_for_store(
+    def lookup(
         self,
-        store: Store,
         product: str,
         *,
-        per_store_results: int,
-    ) -> StorePrice:
-        query = store.build_query(product)
-        try:
-            results = self._client.search(query, num_results=per_store_results)
-        except GoogleSearchError as error:
-            raise RuntimeError(
-                f"Erreur lors de la requête Google pour {store.name}: {error}"
-            ) from error
-
-        best_result: Optional[GoogleSearchResult] = None
-        parsed_price: Optional[ParsedPrice] = None
-        price_source = "unknown"
-
-        for result in results:
-            price = extract_price(result.snippet)
-            source = "snippet" if price else "unknown"
-            if not price:
-                price = self._fetch_price_from_page(result.link, store=store)
-                if price:
-                    source = "page"
-            if price:
-                best_result = result
-                parsed_price = price
-                price_source = source
-                break
-
-        if best_result is None and results:
-            best_result = results[0]
-
-        return StorePrice(
-            store=store, result=best_result, price=parsed_price, source=price_source
+        per_store_results: int = 3,
+        deadline_s: Optional[float] = None,
+    ) -> List[StorePrice]:
+        """Look up ``product`` in every store, in ``STORES`` order.
+
+        Stores still pending once ``deadline_s`` has elapsed are returned
+        with ``source="timeout"``.
+        """
+        return self._run(
+            self._service.lookup(
+                product, per_store_results=per_store_results, deadline_s=deadline_s
+            )
         )
 
-    def _fetch_price_from_page(
-        self, url: str, *, store: Store, timeout: int = 12
-    ) -> Optional[ParsedPrice]:
-        try:
-            response = self._session.get(url, headers=REQUEST_HEADERS, timeout=timeout)
-            response.raise_for_status()
-        except requests.RequestException:
-            return None
+    def close(self) -> None:
+        with self._lock:
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+        if loop is None or thread is None:
+            asyncio.run(self._service.aclose())
+            return
+        asyncio.run_coroutine_threadsafe(self._service.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def __enter__(self) -> "PriceLookupService":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
 
-        text = html.unescape(response.text)
-        parsed = parse_price_from_html(text, domain=store.domain)
-        if parsed:
-            return parsed
+    def _run(self, coroutine: Coroutine[Any, Any, _T]) -> _T:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="price-lookup", daemon=True
+                )
+                self._thread.start()
+            loop = self._loop
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+
+@dataclass
+class SnippetSelection:
+    """Outcome of the snippet phase of a store lookup.
 
-        return None
+    ``confident`` is set when a snippet price reached the threshold: no page
+    needs fetching. Otherwise ``candidates`` are the pages to fetch and
+    ``best`` the most plausible snippet price, used if no page yields one.
+    """
+
+    confident: Optional[StorePrice]
+    best: Optional[StorePrice]
+    candidates: List[GoogleSearchResult]
+
+
+def select_snippet_price(
+    store: Store,
+    product: str,
+    results: List[GoogleSearchResult],
+    *,
+    threshold: float = SNIPPET_CONFIDENCE_THRESHOLD,
+) -> SnippetSelection:
+    """Score the price of every snippet before deciding to fetch any page."""
+    best: Optional[StorePrice] = None
+    best_confidence = -1.0
+    for rank, result in enumerate(results):
+        prices = find_prices(result.snippet)
+        if not prices:
+            continue
+        confidence = snippet_confidence(product, result, prices, rank=rank, total=len(results))
+        if confidence > best_confidence:
+            best_confidence = confidence
+            best = StorePrice(store=store, result=result, price=prices[0][0], source="snippet")
+    if best is not None and best_confidence >= threshold:
+        return SnippetSelection(confident=best, best=best, candidates=[])
+    return SnippetSelection(confident=None, best=best, candidates=list(results))
+
+
+def snippet_confidence(
+    product: str,
+    result: GoogleSearchResult,
+    prices: List[Tuple[ParsedPrice, int, int]],
+    *,
+    rank: int,
+    total: int,
+) -> float:
+    """How likely the first snippet price is the product's price, from 0 to 1.
+
+    The score grows with the share of product words found in the title and
+    snippet and with the Google rank. It drops when the price is qualified
+    (per unit, "à partir de", delivery, discount...) or when the snippet
+    quotes several different prices.
+    """
+    found = _words(f"{result.title} {result.snippet}")
+    words = _words(product)
+    relevance = len(words & found) / len(words) if words else 0.0
+    confidence = 0.3 + 0.4 * relevance + 0.2 * (1 - rank / max(total, 1))
+
+    _, start, end = prices[0]
+    context = result.snippet[max(0, start - 30) : end + 20]
+    if _PRICE_QUALIFIER_RE.search(context):
+        confidence -= 0.4
+    if len({price.value_eur for price, _, _ in prices}) > 1:
+        confidence -= 0.15
+    return max(0.0, min(1.0, confidence))
+
+
+def _words(text: str) -> Set[str]:
+    """Whole words of ``text`` but stopwords, casefolded, without accents or a plural s/x."""
+    plain = unicodedata.normalize("NFKD", text.casefold())
+    plain = "".join(char for char in plain if not unicodedata.combining(char))
+    words = set()
+    for word in _WORD_RE.findall(plain):
+        if word in _STOPWORDS:
+            continue
+        if word[0].isdigit():
+            word = word.replace(",", ".")
+        elif len(word) > 3 and word[-1] in "sx":
+            word = word[:-1]
+        words.add(word)
+    return words
+
+
+def fallback_store_price(
+    store: Store, results: List[GoogleSearchResult]
+) -> StorePrice:
+    return StorePrice(store=store, result=results[0] if results else None, price=None)
 
 
 def format_store_prices(store_prices: Iterable[StorePrice]) -> str:
     lines: List[str] = []
     for store_price in store_prices:
+        if store_price.result is None and store_price.source == "timeout":
+            lines.append(f"- {store_price.store.name}: délai de recherche dépassé.")
+            continue
+        if store_price.result is None and store_price.source == "quota":
+            lines.append(
+                f"- {store_price.store.name}: quota Google épuisé (résultats en cache uniquement)."
+            )
+            continue
+        if store_price.result is None and store_price.source == "error":
+            lines.append(f"- {store_price.store.name}: erreur lors de la recherche.")
+            continue
         if store_price.result is None:
             lines.append(f"- {store_price.store.name}: aucun résultat trouvé.")
             continue
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Mapping, Optional
+
+try:
+    from zoneinfo import ZoneInfo
+
+    QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+except Exception:  # pragma: no cover - tzdata missing (Windows)
+    QUOTA_TIMEZONE = timezone(timedelta(hours=-8))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket, usable from threads and asyncio tasks alike.
+
+    :meth:`reserve` takes a token under a lock and returns how long the caller
+    must wait for it, so the waiting itself happens outside the lock with
+    ``time.sleep`` or ``asyncio.sleep``. The rate adapts: every throttling
+    response halves it (down to ``min_rate_per_s``) and each success brings it
+    back up by a twentieth of ``rate_per_s``.
+    """
+
+    def __init__(
+        self,
+        rate_per_s: float,
+        *,
+        burst: int = 1,
+        min_rate_per_s: Optional[float] = None,
+    ) -> None:
+        if rate_per_s <= 0:
+            raise ValueError("rate_per_s must be positive")
+        self.max_rate = rate_per_s
+        self.min_rate = min(rate_per_s, min_rate_per_s or rate_per_s / 8)
+        self.rate = rate_per_s
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token; return the delay (seconds) before using it."""
+        with self._lock:
+            self._refill_locked()
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def throttled(self, pause_s: float = 0.0) -> None:
+        """Slow down after a 429; no token is handed out for ``pause_s``."""
+        with self._lock:
+            self._refill_locked()
+            self.rate = max(self.min_rate, self.rate / 2)
+            if pause_s > 0:
+                self._tokens = min(self._tokens, -pause_s * self.rate)
+
+    def succeeded(self) -> None:
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def _refill_locked(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class DailyQuota:
+    """Daily request counter persisted in SQLite, shared by every process.
+
+    Google resets the Custom Search quota at midnight Pacific time, so days are
+    counted in that zone. :meth:`try_acquire` refuses requests once fewer than
+    ``reserve`` are left, keeping a margin for requests counted elsewhere.
+    """
+
+    def __init__(self, path: str | Path, *, daily_limit: int, reserve: int = 0) -> None:
+        self.daily_limit = max(0, daily_limit)
+        self.reserve = max(0, reserve)
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_quota ("
+                " day TEXT PRIMARY KEY,"
+                " used INTEGER NOT NULL)"
+            )
+
+    @property
+    def allowance(self) -> int:
+        """Requests that may be sent per day (limit minus the reserve)."""
+        return max(0, self.daily_limit - self.reserve)
+
+    def try_acquire(self) -> bool:
+        """Count one request for today, unless the allowance is used up."""
+        day = _quota_day()
+        with self._lock, self._conn:
+            # A single upsert keeps the check and the increment atomic across
+            # processes sharing the file.
+            cursor = self._conn.execute(
+                "INSERT INTO search_quota (day, used) SELECT ?, 1 WHERE ? > 0"
+                " ON CONFLICT (day) DO UPDATE SET used = used + 1 WHERE used < ?",
+                (day, self.allowance, self.allowance),
+            )
+            return cursor.rowcount == 1
+
+    def exhaust(self) -> None:
+        """Mark today's quota as used up (Google reported it exhausted)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO search_quota (day, used) VALUES (?, ?)"
+                " ON CONFLICT (day) DO UPDATE SET used = MAX(used, excluded.used)",
+                (_quota_day(), self.daily_limit),
+            )
+
+    @property
+    def used(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT used FROM search_quota WHERE day = ?", (_quota_day(),)
+            ).fetchone()
+        return int(row[0]) if row else 0
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.daily_limit - self.used)
+
+    @property
+    def cache_only(self) -> bool:
+        return self.used >= self.allowance
+
+    def describe(self) -> dict:
+        used = self.used
+        return {
+            "day": _quota_day(),
+            "used": used,
+            "daily_limit": self.daily_limit,
+            "remaining": max(0, self.daily_limit - used),
+            "cache_only": used >= self.allowance,
+        }
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+@dataclass
+class ThrottleMetrics:
+    requests: int = 0
+    retries: int = 0
+    throttled: int = 0
+    server_errors: int = 0
+    quota_rejections: int = 0
+
+
+class SearchThrottle:
+    """Rate limit, daily quota and retry policy shared by the search clients.
+
+    One instance is meant to be shared by every sync and async client of a
+    process so they draw from the same token bucket and quota counter.
+    Retries use exponential backoff with full jitter (``base_delay_s`` doubled
+    per attempt, capped at ``max_delay_s``); a ``Retry-After`` header takes
+    precedence, and a request is not retried if it asks for more than
+    ``max_delay_s``.
+    """
+
+    def __init__(
+        self,
+        bucket: TokenBucket,
+        *,
+        quota: Optional[DailyQuota] = None,
+        max_retries: int = 3,
+        base_delay_s: float = 0.5,
+        max_delay_s: float = 30.0,
+    ) -> None:
+        self.bucket = bucket
+        self.quota = quota
+        self.max_retries = max(0, max_retries)
+        self.base_delay_s = base_delay_s
+        self.max_delay_s = max_delay_s
+        self.metrics = ThrottleMetrics()
+        self._lock = threading.Lock()
+
+    @property
+    def cache_only(self) -> bool:
+        return self.quota is not None and self.quota.cache_only
+
+    def admit(self) -> bool:
+        """Count a request against the daily quota; ``False`` means cache-only."""
+        if self.quota is not None and not self.quota.try_acquire():
+            self._count("quota_rejections")
+            return False
+        self._count("requests")
+        return True
+
+    def retry_delay(
+        self,
+        attempt: int,
+        status_code: int,
+        headers: Mapping[str, str],
+        body: str = "",
+    ) -> Optional[float]:
+        """Seconds to wait before retrying a response, or ``None`` to stop.
+
+        ``attempt`` is the number of retries already made. A 429 caused by the
+        daily quota is never retried: the quota is marked exhausted instead.
+        """
+        if status_code not in RETRY_STATUSES:
+            self.bucket.succeeded()
+            return None
+        if status_code == 429:
+            self._count("throttled")
+            if _is_daily_quota_error(body):
+                if self.quota is not None:
+                    self.quota.exhaust()
+                return None
+        else:
+            self._count("server_errors")
+        if attempt >= self.max_retries:
+            return None
+
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        if retry_after is not None:
+            if retry_after > self.max_delay_s:
+                return None
+            delay = retry_after
+        else:
+            delay = random.uniform(0, min(self.max_delay_s, self.base_delay_s * 2**attempt))
+        if status_code == 429:
+            self.bucket.throttled(pause_s=delay)
+        self._count("retries")
+        return delay
+
+    def describe(self) -> dict:
+        with self._lock:
+            data: dict = asdict(self.metrics)
+        data["rate_per_s"] = round(self.bucket.rate, 3)
+        data["quota"] = self.quota.describe() if self.quota else None
+        return data
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self.metrics, name, getattr(self.metrics, name) + 1)
+
+
+def open_search_throttle(
+    quota_path: Optional[str | Path] = None,
+    *,
+    rate_per_s: float = 5.0,
+    burst: int = 5,
+    daily_limit: int = 100,
+    reserve: int = 5,
+) -> SearchThrottle:
+    quota = (
+        DailyQuota(quota_path, daily_limit=daily_limit, reserve=reserve)
+        if quota_path is not None
+        else None
+    )
+    return SearchThrottle(TokenBucket(rate_per_s, burst=burst), quota=quota)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a ``Retry-After`` header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max(0.0, (moment - datetime.now(timezone.utc)).total_seconds())
+
+
+def _is_daily_quota_error(body: str) -> bool:
+    text = body.lower()
+    return "per day" in text or "dailylimitexceeded" in text
+
+
+def _quota_day() -> str:
+    return datetime.now(QUOTA_TIMEZONE).date().isoformat()
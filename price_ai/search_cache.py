@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+CachedPayload = List[dict]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hit_rate, 3),
+        }
+
+
+def make_cache_key(query: str, num: int, lr: str, gl: str) -> str:
+    return json.dumps([query.strip().lower(), num, lr, gl], ensure_ascii=False)
+
+
+class SearchCache(ABC):
+    """Interface of the Google result caches: JSON payloads keyed by string."""
+
+    def __init__(self) -> None:
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CachedPayload]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, payload: CachedPayload) -> None:
+        ...
+
+    def _record(self, hit: bool) -> None:
+        if hit:
+            self.stats.hits += 1
+        else:
+            self.stats.misses += 1
+
+
+class MemorySearchCache(SearchCache):
+    """Bounded in-process LRU with per-entry TTL."""
+
+    def __init__(self, *, max_entries: int = 512, ttl_s: float = 24 * 3600) -> None:
+        super().__init__()
+        self._max_entries = max(1, max_entries)
+        self._ttl_s = ttl_s
+        self._entries: "OrderedDict[str, Tuple[float, CachedPayload]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[CachedPayload]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] > self._ttl_s:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+            self._record(entry is not None)
+            return entry[1] if entry is not None else None
+
+    def set(self, key: str, payload: CachedPayload, *, stored_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (stored_at or time.time(), payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+
+class SqliteSearchCache(SearchCache):
+    """Persistent tier stored in a SQLite file, evicting least recently used rows."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        max_entries: int = 20_000,
+        ttl_s: float = 24 * 3600,
+    ) -> None:
+        super().__init__()
+        self._max_entries = max(1, max_entries)
+        self._ttl_s = ttl_s
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                " key TEXT PRIMARY KEY,"
+                " payload TEXT NOT NULL,"
+                " stored_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_search_cache_accessed_at"
+                " ON search_cache (accessed_at)"
+            )
+
+    def get(self, key: str) -> Optional[CachedPayload]:
+        return self.get_with_age(key)[0]
+
+    def get_with_age(self, key: str) -> Tuple[Optional[CachedPayload], Optional[float]]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT payload, stored_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] > self._ttl_s:
+                self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE search_cache SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+            self._record(row is not None)
+        if row is None:
+            return None, None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, payload: CachedPayload) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, payload, stored_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, json.dumps(payload, ensure_ascii=False), now, now),
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()
+            overflow = count - self._max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM search_cache WHERE key IN ("
+                    " SELECT key FROM search_cache ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                self.stats.evictions += overflow
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class TieredSearchCache(SearchCache):
+    """Memory LRU in front of the SQLite tier; disk hits are promoted."""
+
+    def __init__(self, memory: MemorySearchCache, persistent: SqliteSearchCache) -> None:
+        super().__init__()
+        self.memory = memory
+        self.persistent = persistent
+
+    def get(self, key: str) -> Optional[CachedPayload]:
+        payload = self.memory.get(key)
+        if payload is None:
+            payload, stored_at = self.persistent.get_with_age(key)
+            if payload is not None:
+                self.memory.set(key, payload, stored_at=stored_at)
+        with self._lock:
+            self._record(payload is not None)
+        return payload
+
+    def set(self, key: str, payload: CachedPayload) -> None:
+        self.memory.set(key, payload)
+        self.persistent.set(key, payload)
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            **self.stats.as_dict(),
+            "memory": self.memory.stats.as_dict(),
+            "persistent": self.persistent.stats.as_dict(),
+        }
+
+
+def open_search_cache(
+    path: str | Path,
+    *,
+    ttl_s: float = 24 * 3600,
+    memory_entries: int = 512,
+    disk_entries: int = 20_000,
+) -> TieredSearchCache:
+    return TieredSearchCache(
+        MemorySearchCache(max_entries=memory_entries, ttl_s=ttl_s),
+        SqliteSearchCache(path, max_entries=disk_entries, ttl_s=ttl_s),
+    )
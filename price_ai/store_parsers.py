@@ -1,17 +1,120 @@
 from __future__ import annotations
 
 import json
+import re
 from decimal import Decimal, InvalidOperation
-from typing import Any, Iterable, Optional
+from html import unescape
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from bs4 import BeautifulSoup
 
 from .price_parser import ParsedPrice
 
+# Start tags are found from a keyword in their markup: the markup before each
+# hit is read to check that it falls in a start tag, then the attributes are
+# checked exactly, as BeautifulSoup would. The keywords are searched
+# case-sensitively: a case-insensitive scan is over ten times slower, and
+# attribute values are compared exactly anyway.
+_JSON_LD_KEYWORD = re.compile(r"application/ld\+json")
+_ITEMPROP_KEYWORD = re.compile(r"itemprop")
+_PRICE_META_KEYWORD = re.compile(r"product:price:amount")
+_TAG_NAME_RE = re.compile(r"<([a-zA-Z][^\s/>]*)")
+_RAW_TEXT_END_RE = {
+    "script": re.compile(r"</\s*script\s*>", re.I),
+    "style": re.compile(r"</\s*style\s*>", re.I),
+}
+_QUOTED_VALUE_RE = re.compile(r"""=\s*(["'])""")
+# Text, end tags, declarations and ordinary start tags, skipped in one match;
+# comments, script/style tags and unusual quoting are left to the loop.
+_PLAIN_MARKUP_RE = re.compile(
+    r"""(?:[^<]+"""
+    r"""|<(?!(?:script|style)[\s/>]|!--)[a-zA-Z][^\s/>]*[^>"'=]*(?:=(?:\s*"[^"]*"|\s*'[^']*')?[^>"'=]*)*>"""
+    r"""|<[/!?](?!--)[^>]*>"""
+    r"""|<(?=[^a-zA-Z/!?]))*""",
+    re.I,
+)
+_ATTR_RE = re.compile(
+    r"""([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?"""
+)
+_TEXT_RE = re.compile(r"([^<]*)<(/?)([a-zA-Z][^\s/>]*)?")
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source"}
+
+
+class _NeedsSoup(Exception):
+    """The fast scan cannot tell what BeautifulSoup would return."""
+
 
 def parse_price_from_html(
     html: str, *, domain: Optional[str] = None, preferred_currency: str = "EUR"
 ) -> Optional[ParsedPrice]:
+    """Read the product price of a store page without building a DOM.
+
+    Looks at the JSON-LD blocks, then the first ``itemprop="price"`` element,
+    then the ``product:price:amount`` meta tag, in the order of
+    :func:`parse_price_from_soup`, stopping at the first price. Entities are
+    only decoded in the fragments that are read. A page goes through the soup
+    path only when its ``itemprop`` element wraps nested markup. Unlike the
+    soup path, an ``itemprop`` attribute name must be written in lowercase.
+    """
+    price, _ = _scan_json_ld(html, preferred_currency=preferred_currency)
+    if price:
+        return price
+    try:
+        return _scan_meta_tags(html)
+    except _NeedsSoup:
+        return _price_from_meta_tags(BeautifulSoup(unescape(html), "html.parser"))
+
+
+class IncrementalPriceDetector:
+    """Find a page price while the page is still downloading.
+
+    A JSON-LD price can be confirmed as soon as its block is complete, since
+    the rest of the page cannot outrank it. Other sources need the whole page;
+    :meth:`close` applies :func:`parse_price_from_html` to what was fed.
+    """
+
+    def __init__(self, *, domain: Optional[str] = None, preferred_currency: str = "EUR") -> None:
+        self.domain = domain
+        self.preferred_currency = preferred_currency
+        self.price: Optional[ParsedPrice] = None
+        self._chunks: List[str] = []
+        # Text from the first markup the scans have not read to the end yet.
+        self._pending = ""
+
+    @property
+    def text(self) -> str:
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def feed(self, chunk: str) -> Optional[ParsedPrice]:
+        """Add a chunk; return the price once it is confirmed.
+
+        Only the pending text is scanned: each call reads the new chunk plus
+        whatever markup the previous call left unfinished.
+        """
+        if self.price is not None:
+            return self.price
+        self._chunks.append(chunk)
+        pending = self._pending + chunk
+        self.price, resume = _scan_json_ld(pending, preferred_currency=self.preferred_currency)
+        if self.price is None:
+            resume = _MarkupReader(pending, resume).read_to_end()
+        self._pending = pending[resume:]
+        return self.price
+
+    def close(self) -> Optional[ParsedPrice]:
+        if self.price is None:
+            self.price = parse_price_from_html(
+                self.text, domain=self.domain, preferred_currency=self.preferred_currency
+            )
+        return self.price
+
+
+def parse_price_from_soup(
+    html: str, *, domain: Optional[str] = None, preferred_currency: str = "EUR"
+) -> Optional[ParsedPrice]:
+    """Reference implementation on a full BeautifulSoup tree of ``html``."""
     soup = BeautifulSoup(html, "html.parser")
 
     price = _price_from_json_ld(soup, preferred_currency=preferred_currency)
@@ -64,6 +167,190 @@ def _price_from_meta_tags(soup: BeautifulSoup) -> Optional[ParsedPrice]:
     return None
 
 
+def _scan_json_ld(
+    html: str, *, preferred_currency: str, start: int = 0
+) -> Tuple[Optional[ParsedPrice], int]:
+    """First JSON-LD price from ``start``, and the offset the scan stopped at.
+
+    A longer version of the same text can be scanned again from that offset
+    (see :class:`_MarkupReader`).
+    """
+    reader = _MarkupReader(html, start)
+    for data in _json_ld_blocks(reader):
+        for value, currency in _iter_price_candidates(data):
+            parsed = _build_parsed_price(value, currency or preferred_currency)
+            if parsed:
+                return parsed, reader.position
+    return None, reader.position
+
+
+def _json_ld_blocks(reader: _MarkupReader) -> Iterator[Any]:
+    """Decoded JSON-LD scripts found by ``reader``.
+
+    An undecodable block comes out as ``None``. The scan stops at a block whose
+    end has not been received yet, leaving ``reader.position`` on its tag.
+    """
+    html = reader.html
+    for name, attrs, end in reader.tags_with(_JSON_LD_KEYWORD):
+        if name != "script" or attrs.get("type") != "application/ld+json":
+            continue
+        closing = _RAW_TEXT_END_RE["script"].search(html, end)
+        if closing is None:
+            return
+        try:
+            data = json.loads(unescape(html[end : closing.start()]))
+        except json.JSONDecodeError:
+            data = None
+        yield data
+
+
+def _scan_meta_tags(html: str) -> Optional[ParsedPrice]:
+    for name, attrs, end in _tags_with(html, _ITEMPROP_KEYWORD):
+        if attrs.get("itemprop") != "price":
+            continue
+        if "content" in attrs:
+            parsed = _build_parsed_price(attrs["content"], None)
+        else:
+            parsed = _build_parsed_price(_element_text(html, name, end), None)
+        if parsed:
+            return parsed
+        break
+
+    for name, attrs, _end in _tags_with(html, _PRICE_META_KEYWORD):
+        if name != "meta" or attrs.get("property") != "product:price:amount":
+            continue
+        if "content" in attrs:
+            return _build_parsed_price(attrs["content"], None)
+        break
+    return None
+
+
+def _tags_with(
+    html: str, keyword: "re.Pattern[str]", position: int = 0
+) -> Iterator[Tuple[str, Dict[str, str], int]]:
+    return _MarkupReader(html, position).tags_with(keyword)
+
+
+class _MarkupReader:
+    """Reads ``html`` forward from ``position`` as html.parser reads it.
+
+    ``position`` always lies outside tags, comments and script/style bodies.
+    Reading stops at markup that is not complete yet (``complete`` turns
+    false) and leaves ``position`` on it, so a longer version of the same
+    text can be read again from there.
+    """
+
+    def __init__(self, html: str, position: int = 0) -> None:
+        self.html = html
+        self.position = position
+        self.complete = True
+
+    def tags_with(self, keyword: "re.Pattern[str]") -> Iterator[Tuple[str, Dict[str, str], int]]:
+        """Start tags whose markup contains ``keyword``, in order.
+
+        Keyword hits in text, comments and script/style bodies are skipped,
+        and a quoted attribute value may contain ``>``. Yields the lowercased
+        tag name, its attributes and the offset just past the tag.
+        """
+        html = self.html
+        while self.complete:
+            hit = keyword.search(html, self.position)
+            if hit is None:
+                return
+            tag = self._read(hit.start())
+            if tag is None:
+                if self.complete:
+                    self.position = max(self.position, hit.end())
+                continue
+            name, end = tag
+            yield name.group(1).lower(), _attributes(html[name.end() : end]), end + 1
+            self._skip(name, end)
+
+    def read_to_end(self) -> int:
+        """Read every complete markup item; returns the new ``position``."""
+        self._read(len(self.html))
+        return self.position
+
+    def _read(self, limit: int) -> Optional[Tuple["re.Match[str]", int]]:
+        """Read the markup that starts before ``limit``.
+
+        Returns the start tag spanning ``limit``, as its name match and the
+        offset of its ``>``, with ``position`` left on it.
+        """
+        html = self.html
+        while self.complete and self.position < limit:
+            self.position = _PLAIN_MARKUP_RE.match(html, self.position, limit).end()
+            start = self.position
+            if start == limit:
+                break
+            if html.startswith("<!--", start):
+                close = html.find("-->", start + 4)
+                if close == -1:
+                    self.complete = False
+                else:
+                    self.position = close + 3
+                continue
+            name = _TAG_NAME_RE.match(html, start)
+            end = _tag_end(html, name.end()) if name else html.find(">", start + 2)
+            if end == -1:
+                self.complete = False
+            elif name is None:
+                self.position = end + 1
+            elif end > limit:
+                return name, end
+            else:
+                self._skip(name, end)
+        return None
+
+    def _skip(self, name: "re.Match[str]", end: int) -> None:
+        """Move past the start tag ending at ``end`` and, for script/style, its body."""
+        raw_text_end = _RAW_TEXT_END_RE.get(name.group(1).lower())
+        if raw_text_end is None:
+            self.position = end + 1
+            return
+        closing = raw_text_end.search(self.html, end + 1)
+        if closing is None:
+            self.position = name.start()
+            self.complete = False
+        else:
+            self.position = closing.end()
+
+
+def _tag_end(html: str, position: int) -> int:
+    """Offset of the ``>`` ending a start tag whose attributes begin at ``position``.
+
+    Returns -1 when the tag is not complete yet.
+    """
+    while True:
+        close = html.find(">", position)
+        if close == -1:
+            return -1
+        quote = _QUOTED_VALUE_RE.search(html, position, close)
+        if quote is None:
+            return close
+        position = html.find(quote.group(1), quote.end()) + 1
+        if position == 0:
+            return -1
+
+
+def _attributes(source: str) -> Dict[str, str]:
+    attrs: Dict[str, str] = {}
+    for name, double, single, bare in _ATTR_RE.findall(source):
+        attrs[name.lower()] = unescape(double or single or bare)
+    return attrs
+
+
+def _element_text(html: str, tag: str, end: int) -> str:
+    """Text of the element whose start tag ends at ``end``, if it has no markup."""
+    if tag in _VOID_TAGS or html[end - 2] == "/":
+        return ""
+    following = _TEXT_RE.match(html, end)
+    closing = (following.group(3) or "").lower() if following else ""
+    if following is None or not following.group(2) or closing != tag:
+        raise _NeedsSoup
+    return unescape(following.group(1)).strip()
+
+
 def _iter_price_candidates(data: Any) -> Iterable[tuple[Any, Optional[str]]]:
     if isinstance(data, dict):
         if "price" in data:
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, TextIO
+
+from dotenv import load_dotenv
+
+from price_ai.async_price_service import AsyncPriceLookupService, unique_products
+from price_ai.page_cache import PageCache
+from price_ai.rate_limit import open_search_throttle
+from price_ai.search_cache import open_search_cache
+from price_ai.stores import STORES
+from shared.utils import log_info
+
+OUTPUT_COLUMNS = ["produit", "magasin", "prix", "source", "titre", "lien"]
+DEFAULT_COLUMN = "produit"
+NO_PRICE_LABELS = {
+    "timeout": "délai dépassé",
+    "error": "erreur de recherche",
+    "quota": "quota Google épuisé",
+}
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Recherche les prix d'une liste de matériaux (BOM) chez Point.P, Brico Dépôt "
+            "et Castorama. Les produits en double ne sont recherchés qu'une fois."
+        )
+    )
+    parser.add_argument(
+        "source",
+        help="Fichier texte (un produit par ligne), CSV, ou '-' pour l'entrée standard.",
+    )
+    parser.add_argument(
+        "--column",
+        help=(
+            f"Colonne contenant le produit dans un CSV (par défaut '{DEFAULT_COLUMN}', "
+            "ou la première colonne si le CSV n'a pas d'en-tête)."
+        ),
+    )
+    parser.add_argument(
+        "--output",
+        help="Écrit les résultats dans ce CSV au fur et à mesure.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=10,
+        help="Nombre maximal de requêtes Google simultanées.",
+    )
+    parser.add_argument(
+        "--per-store-concurrency",
+        type=int,
+        default=5,
+        help="Nombre maximal de pages téléchargées simultanément par magasin.",
+    )
+    parser.add_argument(
+        "--per-store-results",
+        type=int,
+        default=3,
+        help="Nombre de résultats Google à analyser par magasin (1 à 10).",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=None,
+        help="Durée maximale (secondes) de l'ensemble des recherches.",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=5.0,
+        help="Nombre maximal de requêtes Google par seconde.",
+    )
+    parser.add_argument(
+        "--daily-quota",
+        type=int,
+        default=100,
+        help="Quota quotidien Google (compté dans --cache-dir, partagé avec le backend).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Dossier des caches Google et pages (partageable avec le backend).",
+    )
+    return parser.parse_args()
+
+
+def read_products(source: str, column: Optional[str] = None) -> List[str]:
+    """Product names from a text file, a CSV file or stdin (``-``).
+
+    A CSV with a header must contain ``column`` (``DEFAULT_COLUMN`` when not
+    given); a CSV without a header is read from its first column. Headers are
+    guessed with ``csv.Sniffer``, which is unreliable on a single column: a
+    one-column file is taken as headerless unless ``column`` matches.
+    """
+    if source == "-":
+        return sys.stdin.read().splitlines()
+    path = Path(source)
+    with path.open(encoding="utf-8-sig", newline="") as handle:
+        if path.suffix.lower() != ".csv":
+            return handle.read().splitlines()
+        sample = handle.read(4096)
+        handle.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        rows = list(csv.reader(handle, dialect))
+    if not rows:
+        return []
+    header = [cell.strip().casefold() for cell in rows[0]]
+    wanted = (column or DEFAULT_COLUMN).casefold()
+    if wanted in header:
+        index = header.index(wanted)
+        rows = rows[1:]
+    elif column is not None or (len(rows[0]) > 1 and _has_header(sample)):
+        raise ValueError(
+            f"Colonne '{column or DEFAULT_COLUMN}' absente de {path.name} "
+            f"(colonnes: {', '.join(cell.strip() for cell in rows[0])}). Utilisez --column."
+        )
+    else:
+        index = 0
+    return [row[index] for row in rows if len(row) > index]
+
+
+def _has_header(sample: str) -> bool:
+    try:
+        return csv.Sniffer().has_header(sample)
+    except csv.Error:
+        return False
+
+
+async def run(args: argparse.Namespace, products: List[str], output: Optional[TextIO]) -> int:
+    cache = page_cache = quota_path = None
+    if args.cache_dir:
+        cache_dir = Path(args.cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        cache = open_search_cache(cache_dir / "google_search.sqlite3")
+        page_cache = PageCache(cache_dir / "pages.sqlite3")
+        quota_path = cache_dir / "google_quota.sqlite3"
+    throttle = open_search_throttle(
+        quota_path, rate_per_s=args.rate, daily_limit=args.daily_quota
+    )
+
+    writer = csv.writer(output) if output else None
+    if writer:
+        writer.writerow(OUTPUT_COLUMNS)
+
+    total = len(products) * len(STORES)
+    count = 0
+    async with AsyncPriceLookupService(
+        max_connections=max(10, args.concurrency * 2),
+        cache=cache,
+        page_cache=page_cache,
+        throttle=throttle,
+    ) as service:
+        async for item in service.lookup_many(
+            products,
+            per_store_results=args.per_store_results,
+            max_concurrent_searches=args.concurrency,
+            per_store_concurrency=args.per_store_concurrency,
+            deadline_s=args.deadline,
+        ):
+            count += 1
+            store_price = item.store_price
+            if store_price.price:
+                price = f"{store_price.price.raw} € ({store_price.source})"
+            elif store_price.result is None:
+                price = NO_PRICE_LABELS.get(store_price.source, "aucun résultat")
+            else:
+                price = "prix non détecté"
+            print(f"[{count}/{total}] {item.product} | {store_price.store.name}: {price}")
+            if writer:
+                writer.writerow(
+                    [
+                        item.product,
+                        store_price.store.name,
+                        store_price.price.value_eur if store_price.price else "",
+                        store_price.source,
+                        store_price.result.title if store_price.result else "",
+                        store_price.result.link if store_price.result else "",
+                    ]
+                )
+                output.flush()
+    log_info(f"Google: {throttle.describe()}")
+    return count
+
+
+def main() -> None:
+    load_dotenv()
+    args = parse_arguments()
+
+    try:
+        lines = read_products(args.source, args.column)
+    except ValueError as error:
+        raise SystemExit(error) from error
+    products = unique_products(lines)
+    log_info(f"{len(lines)} ligne(s) lue(s), {len(products)} produit(s) distinct(s)")
+    if not products:
+        return
+
+    output = open(args.output, "w", encoding="utf-8", newline="") if args.output else None
+    started = time.perf_counter()
+    try:
+        count = asyncio.run(run(args, products, output))
+    except ValueError as error:
+        raise SystemExit(error) from error
+    finally:
+        if output:
+            output.close()
+
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    log_info(
+        f"Terminé: {count} recherche(s) produit × magasin en {elapsed:.1f} s "
+        f"| {count / elapsed:.2f} recherches/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from html import unescape
+from pathlib import Path
+from typing import Callable, Iterator, List, Tuple
+
+from price_ai.store_parsers import parse_price_from_html, parse_price_from_soup
+from price_ai.stores import STORES
+
+# JSON-LD shapes where following fixed paths in Product nodes disagrees with
+# the generic walk: an AggregateOffer, an ItemList before the Product, a
+# Product with its own price, an Offer first in @graph.
+JSON_LD_SHAPES = [
+    {
+        "@type": "Product",
+        "offers": {"@type": "AggregateOffer", "lowPrice": "5", "highPrice": "9", "price": "7"},
+    },
+    [
+        {"@type": "ItemList", "itemListElement": [{"@type": "Product", "offers": {"price": "12"}}]},
+        {"@type": "Product", "offers": {"price": "99"}},
+    ],
+    {"@type": "Product", "price": "4", "offers": {"price": "3"}},
+    {"@graph": [{"@type": "Offer", "price": "1"}, {"@type": "Product", "offers": {"price": "2"}}]},
+]
+
+# Markup where a keyword scan without context goes wrong: price keywords in
+# script/style bodies and comments, ``>`` and ``<`` inside quoted attributes.
+CORPUS = [
+    *(f'<script type="application/ld+json">{json.dumps(shape)}</script>' for shape in JSON_LD_SHAPES),
+    """<script>var t='<span itemprop="price" content="1.00">';</script>"""
+    """<span itemprop="price" content="99.00">""",
+    """<div data-x="a>b" itemprop="price" content="3.00">""",
+    """<div title='a<b' itemprop="price" content="3.50">""",
+    """<!-- <span itemprop="price" content="1.00"> --><span itemprop="price" content="4.00">""",
+    """<style>/* itemprop="price" */ a>b {}</style>"""
+    """<meta property="product:price:amount" content="5.50">""",
+    """<p>itemprop="price" content="1"</p><span itemprop="price" content="8">""",
+    """<div class=it's itemprop="price" content="6">""",
+    """<div title='x>' itemprop="price">7,25</div>""",
+    """<script>x='<script type="application/ld+json">{"offers":{"price":1}}'</script>"""
+    """<script type="application/ld+json">{"@type":"Product","offers":{"price":"2.5"}}</script>""",
+    """<SCRIPT>document.write('<meta property="product:price:amount" content="1">')</SCRIPT>"""
+    """<meta property="product:price:amount" content="12.00">""",
+]
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compare le débit de l'extracteur de prix rapide et du parsing "
+            "BeautifulSoup complet sur des pages magasin enregistrées."
+        )
+    )
+    parser.add_argument(
+        "pages",
+        nargs="*",
+        help="Pages HTML enregistrées (ex: pages/castorama-*.html).",
+    )
+    parser.add_argument(
+        "--fuzz",
+        type=int,
+        default=3000,
+        help="Nombre de pages aléatoires comparées au parsing BeautifulSoup.",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Graine du générateur aléatoire.")
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Nombre de passes par page (le meilleur temps est retenu).",
+    )
+    return parser.parse_args()
+
+
+def best_time(function: Callable[[], object], repeat: int) -> float:
+    timings: List[float] = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def random_pages(count: int, seed: int) -> Iterator[str]:
+    rng = random.Random(seed)
+
+    def block() -> str:
+        price = rng.choice(["12,99", "1 299.00", "abc", "", "7.5", "42"])
+        offer = json.dumps({"@type": "Product", "offers": {"price": price, "priceCurrency": "EUR"}})
+        shape = json.dumps(rng.choice(JSON_LD_SHAPES))
+        return rng.choice(
+            [
+                f'<script type="application/ld+json">{offer}</script>',
+                f'<script type="application/ld+json">{shape}</script>',
+                "<script type='application/ld+json'>{bad json</script>",
+                f'<span itemprop="price" content="{price}">x</span>',
+                f'<span class="a" itemprop="price">{price}</span>',
+                f'<div itemprop="price"><b>{price}</b>€</div>',
+                f'<meta property="product:price:amount" content="{price}">',
+                '<meta property="product:price:amount">',
+                f'<SPAN itemprop="price">&nbsp;{price}&nbsp;</SPAN>',
+                f"<p>Prix &amp; promo {price} &euro;</p>",
+                f"<script>var t = '<span itemprop=\"price\" content=\"{price}\">';</script>",
+                '<style>a[itemprop="price"] > b {}</style>',
+                f'<!-- <meta property="product:price:amount" content="{price}"> -->',
+                f'<div data-x="a>b" itemprop="price" content="{price}">',
+                f"<a title='<b>' href=x>{price}</a>",
+            ]
+        )
+
+    for _ in range(count):
+        yield "<html><body>" + "".join(block() for _ in range(rng.randint(1, 6))) + "</body></html>"
+
+
+def check_corpus(fuzz: int, seed: int) -> int:
+    """Compare both paths on :data:`CORPUS` and random pages; exit on a difference.
+
+    The fast path is run for every store domain as well as without one.
+    """
+    checked = 0
+    domains = [None, *(store.domain for store in STORES)]
+    for html in [*CORPUS, *random_pages(fuzz, seed)]:
+        soup = parse_price_from_soup(unescape(html))
+        for domain in domains:
+            fast = parse_price_from_html(html, domain=domain)
+            if fast != soup:
+                print(f"Différence sur {html!r} ({domain}):\n  soup   {soup}\n  rapide {fast}")
+                sys.exit(1)
+        checked += 1
+    return checked
+
+
+def main() -> None:
+    args = parse_arguments()
+    checked = check_corpus(args.fuzz, args.seed)
+    print(f"{checked} page(s) de contrôle identiques au parsing BeautifulSoup")
+    if not args.pages:
+        return
+    totals: List[Tuple[int, float, float]] = []
+    disagreements = 0
+    for page in map(Path, args.pages):
+        text = page.read_text(encoding="utf-8", errors="replace")
+        fast = parse_price_from_html(text)
+        # The previous pipeline: unescape the whole page, then build the tree.
+        soup = parse_price_from_soup(unescape(text))
+        fast_s = best_time(lambda: parse_price_from_html(text), args.repeat)
+        soup_s = best_time(lambda: parse_price_from_soup(unescape(text)), args.repeat)
+        same = fast == soup
+        disagreements += not same
+        totals.append((len(text), fast_s, soup_s))
+        print(
+            f"{page.name}: {len(text) / 1024:.0f} Ko | rapide {fast_s * 1000:.1f} ms "
+            f"| soup {soup_s * 1000:.1f} ms | x{soup_s / max(fast_s, 1e-9):.0f} "
+            f"| prix {fast.raw if fast else '-'}{'' if same else f' (soup: {soup.raw if soup else None})'}"
+        )
+
+    size = sum(item[0] for item in totals) / (1024 * 1024)
+    fast_total = sum(item[1] for item in totals)
+    soup_total = sum(item[2] for item in totals)
+    print(
+        f"Total {len(totals)} page(s), {size:.1f} Mo: rapide {size / max(fast_total, 1e-9):.1f} Mo/s, "
+        f"soup {size / max(soup_total, 1e-9):.1f} Mo/s, {disagreements} désaccord(s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
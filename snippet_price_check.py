@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import List, Optional, Tuple
+
+from price_ai.google_search import GoogleSearchResult
+from price_ai.price_parser import find_prices
+from price_ai.price_service import SNIPPET_CONFIDENCE_THRESHOLD, select_snippet_price
+from price_ai.stores import STORES
+
+# Hand-labelled Google results: the product searched, the (title, snippet) of
+# each result in rank order, and the item price in euros as a reader would
+# take it from the snippets (None when none shows it). They cover the traps
+# the score is meant to avoid: prices per unit or "à partir de", delivery
+# fees, several prices in one snippet, another product ranked first, product
+# words inside longer words.
+LABELLED: List[Tuple[str, List[Tuple[str, str]], Optional[float]]] = [
+    (
+        "ciment 35 kg",
+        [
+            ("Ciment gris CEM II 35 kg", "Ciment gris pour maçonnerie, sac de 35kg. 9,95 € TTC."),
+            ("Mortier 25 kg", "Mortier bâtard prêt à gâcher 7,50 €."),
+        ],
+        9.95,
+    ),
+    (
+        "colle carrelage",
+        [
+            ("Collecteur d'eau de pluie 300 L", "Collecteur pour gouttière, 12,90 €."),
+            ("Colle carrelage C2 25 kg", "Colle pour carrelage sol et mur, 18,50 €."),
+        ],
+        18.5,
+    ),
+    (
+        "colle PVC",
+        [
+            ("Collecteur PVC 100 mm", "Collecteur PVC gris pour descente, 12,90 €."),
+            ("Colle PVC pression 250 ml", "Colle PVC pour tubes et raccords pression, 8,90 €."),
+        ],
+        8.9,
+    ),
+    (
+        "bois de chauffage",
+        [
+            ("Boisseau de chauffage pour cheminée", "Boisseau de conduit de chauffage 20 x 20 cm, 24,90 €."),
+            ("Bois de chauffage chêne 40 cm", "Sac de bois de chauffage sec 40 dm3, 8,90 €."),
+        ],
+        8.9,
+    ),
+    (
+        "parquet chêne",
+        [
+            ("Parquet contrecollé chêne naturel", "Parquet chêne 14 mm : 34,90 € le m² soit 76,78 € le paquet."),
+        ],
+        76.78,
+    ),
+    (
+        "plaque de plâtre BA13",
+        [
+            ("Plaque de plâtre BA13 standard 250 x 120 cm", "Livraison à partir de 29,00 €. Plaque BA13 : 8,45 €."),
+        ],
+        8.45,
+    ),
+    (
+        "peinture blanche 10 L",
+        [
+            ("Peinture acrylique blanche mat 10 L", "Peinture murs et plafonds, pot de 10L à 49,90 €."),
+            ("Peinture blanche 2,5 L", "Peinture blanche satin 2,5 L, 24,90 €."),
+        ],
+        49.9,
+    ),
+    (
+        "laine de verre 100 mm",
+        [
+            ("Rouleau laine de verre 100 mm", "Dès 3,20 € le m², rouleau de 100 mm."),
+            ("Laine de verre déroulée 100 mm R=2,5", "Rouleau de 6 m², 27,90 €."),
+        ],
+        27.9,
+    ),
+    (
+        "vis inox 4x40",
+        [
+            ("Boîte de 200 vis inox 4x40 mm", "Vis bois tête fraisée inox A2 4 x 40 mm, la boîte : 14,20 €."),
+        ],
+        14.2,
+    ),
+    (
+        "sable 0/4",
+        [
+            ("Sable de rivière 0/4 big bag", "Big bag 1 tonne, 89,00 €. Reprise du big bag : 10,00 €."),
+        ],
+        89.0,
+    ),
+    (
+        "tuyau PER 16",
+        [
+            ("Raccord PER 16", "Raccord à sertir pour tube PER diamètre 16, 3,45 €."),
+            ("Tube PER nu 16 mm couronne 50 m", "Tuyau PER 16 mm en couronne de 50 m à 42,90 €."),
+        ],
+        42.9,
+    ),
+    (
+        "porte d'entrée",
+        [
+            ("Porte d'entrée aluminium", "Porte d'entrée alu gris anthracite, 1 290,00 €. Économisez 200,00 €."),
+        ],
+        1290.0,
+    ),
+    (
+        "carrelage sol 60x60",
+        [
+            ("Carrelage sol intérieur 60x60 gris", "Carrelage grès cérame 60 x 60 cm, 19,90 € / m2."),
+        ],
+        None,
+    ),
+    (
+        "mitigeur lavabo",
+        [
+            ("Mitigeur lavabo chromé", "Mitigeur pour lavabo, cartouche céramique : 39,90 €."),
+            ("Mitigeur évier", "Mitigeur évier bec haut : 45,00 €."),
+        ],
+        39.9,
+    ),
+    (
+        "béton prêt à l'emploi 35 kg",
+        [
+            ("Ciment prompt 5 kg", "Ciment prompt prise rapide 5 kg, 11,50 €."),
+            ("Béton prêt à l'emploi 35kg", "Sac de béton prêt à l'emploi 35 kg : 6,95 €."),
+        ],
+        6.95,
+    ),
+    (
+        "escabeau 5 marches",
+        [
+            ("Escabeau aluminium 5 marches", "Escabeau 5 marches, 59,90 € au lieu de 79,90 €."),
+        ],
+        59.9,
+    ),
+]
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compare le prix retenu dans les extraits Google (score de confiance) "
+            "à l'ancienne règle du premier extrait sur un jeu étiqueté à la main."
+        )
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=SNIPPET_CONFIDENCE_THRESHOLD,
+        help="Seuil au-delà duquel aucune page n'est téléchargée.",
+    )
+    return parser.parse_args()
+
+
+def first_snippet_price(results: List[GoogleSearchResult]) -> Optional[float]:
+    """The previous rule: first price of the first snippet that has one."""
+    for result in results:
+        prices = find_prices(result.snippet)
+        if prices:
+            return prices[0][0].value_eur
+    return None
+
+
+def main() -> None:
+    args = parse_arguments()
+    store = STORES[0]
+    old_wrong = new_right = new_wrong = 0
+    for product, snippets, expected in LABELLED:
+        results = [
+            GoogleSearchResult(title=title, link=f"https://{store.domain}/{rank}", snippet=snippet)
+            for rank, (title, snippet) in enumerate(snippets)
+        ]
+        old = first_snippet_price(results)
+        selection = select_snippet_price(store, product, results, threshold=args.threshold)
+        old_wrong += old != expected
+        # Below the threshold the pages are fetched and the snippet price is
+        # only a fallback: that costs time but is never a wrong pick.
+        if selection.confident:
+            new = selection.confident.price.value_eur
+            new_right += new == expected
+            new_wrong += new != expected
+        else:
+            new = "pages"
+        print(f"{product}: attendu {expected} | premier extrait {old} | score {new}")
+
+    total = len(LABELLED)
+    print(
+        f"Premier extrait : {total - old_wrong}/{total} justes. Score (seuil {args.threshold}) : "
+        f"{new_right} justes, {new_wrong} faux, {total - new_right - new_wrong} pages téléchargées"
+    )
+    if new_wrong:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()